@@ -1,3 +1,8 @@
-from .cli import main
+import sys as _SYS
+
+if "--startup-report" in _SYS.argv[1:]:
+  from .cli.startup import main
+else:
+  from .cli import main
 
 main()
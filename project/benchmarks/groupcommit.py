@@ -0,0 +1,144 @@
+import argparse as _ARGPARSE
+import os as _OS
+import tempfile as _TEMPFILE
+import threading as _THREADING
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks booking throughput when many threads book at once,
+comparing one transaction per booking (`Database.booking__create`) against
+the group commit writer (`GroupCommitWriter`) with a few batching windows.
+
+It uses a temporary database, with the `durable` profile by default, so every
+commit waits for the disk to sync.
+"""
+
+
+
+WINDOWS_MS = [0.5, 2, 5]
+"""Batching windows of the group commit writer to compare"""
+
+
+
+def percentile(times: list[float], fraction: float) -> float:
+  """The time `fraction` of the way through the sorted times"""
+
+  times = sorted(times)
+  return times[min(len(times) - 1, int(len(times) * fraction))]
+
+
+def runThreads(threads: int, bookings: int, book) -> tuple[float, list[float]]:
+  """
+  Make `bookings` bookings on each of `threads` threads with `book(i)`, returns
+  the seconds it took and the latency of every booking
+  """
+
+  times: list[list[float]] = [ [] for _ in range(threads) ]
+  failures = []
+  start = _THREADING.Barrier(threads + 1)
+
+  def run(thread: int):
+    start.wait()
+    for i in range(bookings):
+      began = _TIME.perf_counter()
+      if book(thread * bookings + i) is None:
+        failures.append(i)
+      times[thread].append(_TIME.perf_counter() - began)
+
+  workers = [
+    _THREADING.Thread(target=run, args=(thread,))
+    for thread in range(threads)
+  ]
+  for worker in workers: worker.start()
+
+  start.wait()
+  began = _TIME.perf_counter()
+  for worker in workers: worker.join()
+  elapsed = _TIME.perf_counter() - began
+
+  if len(failures) > 0:
+    raise Exception(f"{len(failures)} bookings failed")
+
+  return elapsed, [ time for thread in times for time in thread ]
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--threads", type=int, default=16,
+    help="number of threads booking at once")
+  parser.add_argument("--bookings", type=int, default=100,
+    help="number of bookings each thread makes")
+  parser.add_argument("--max-batch", type=int, default=100,
+    help="most bookings the group commit writer commits at once")
+  parser.add_argument("--profile", default="durable",
+    help="database profile, see `Config.PROFILES`")
+  args = parser.parse_args()
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    # The database client reads it's configuration when it's first imported
+    _OS.environ["DTS_DB_PATH"] = _OS.path.join(directory, "groupcommit.db")
+    _OS.environ["DTS_DB_PROFILE"] = args.profile
+
+    from project.database import Database
+    from project.database.queries import Queries
+    from project.database.seed import seed
+    from project.database.writer import GroupCommitWriter
+
+    seed()
+    userId = str(Queries.Tables.User.id_by_username("admin"))
+    filmTitles = Database.film__allTitles()
+
+    def booking(i: int):
+      return (
+        userId,
+        _DT(2026, 1, 1) + _TD(minutes=i),
+        filmTitles[i % len(filmTitles)],
+        ["ADULT", "CHILD"],
+      )
+
+    rows = []
+    total = args.threads * args.bookings
+
+    def addRow(name: str, elapsed: float, times: list[float], meanBatch: float):
+      rows.append([
+        name,
+        f"{total / elapsed:.0f}",
+        f"{percentile(times, 0.5) * 1000:.2f}",
+        f"{percentile(times, 0.99) * 1000:.2f}",
+        f"{meanBatch:.1f}",
+      ])
+
+    elapsed, times = runThreads(args.threads, args.bookings,
+      lambda i: Database.booking__create(*booking(i))
+    )
+    addRow("one transaction each", elapsed, times, 1)
+
+    for windowMs in WINDOWS_MS:
+      with GroupCommitWriter(
+        window=windowMs / 1000, maxBatch=args.max_batch
+      ) as writer:
+        elapsed, times = runThreads(args.threads, args.bookings,
+          lambda i: writer.booking__create(*booking(i)).result()
+        )
+      addRow(f"group commit {windowMs:g}ms", elapsed, times,
+        writer.stats()["meanBatch"]
+      )
+
+  print(
+    f"{args.threads} threads making {args.bookings} bookings each "
+    f"({args.profile} profile)"
+  )
+  _Utils.printTable(
+    ["Path", "Bookings/s", "p50 ms", "p99 ms", "Mean batch"],
+    rows
+  )
+
+
+
+if __name__ == "__main__":
+  main()
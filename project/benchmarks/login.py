@@ -0,0 +1,141 @@
+import statistics as _STATISTICS
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+import peewee as _PW
+
+from project.database import Database as _Database
+from project.database.client import dbClient as _dbClient
+from project.database.queries import Queries as _dbQueries
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks how long logging in takes as the user's booking history
+grows.
+
+It compares the old login path (`user__idByAuth` then prefetching the user's
+permission groups and every booking they have made) against
+`Database.user__dataByAuth`.
+
+Everything runs inside a transaction that is rolled back, so the database is
+left untouched.
+"""
+
+
+
+BOOKING_COUNTS = [0, 10, 100, 1_000, 10_000]
+
+ITERATIONS = 200
+
+MAX_SECONDS = 3
+"""Stop timing a login early if it's this slow, so the benchmark ends quickly"""
+
+FILM_TITLE = "Benchmark Film"
+
+
+
+def legacyLogin(username: str, password: str):
+  """
+  The login path before it was a single query, inlined as 
+  `Database.user__dataById` is now served from the user cache
+  """
+
+  userId = _Database.user__idByAuth(username, password)
+  if userId is None: return None
+
+  Tables = _dbClient.Tables
+  User = Tables.User
+  UserPermissionGroups = Tables.UserPermissionGroups
+  PermissionGroup = Tables.PermissionGroup
+  Booking = Tables.Booking
+
+  res = (User
+    .select(User.id, User.username, User.contactPhone)
+    .where(User.id == userId)
+    .prefetch(UserPermissionGroups, PermissionGroup, Booking)
+  )
+  if len(res) != 1: raise Exception()
+  user = res[0]
+
+  return {
+    "id": user.id,
+    "username": user.username,
+    "contactPhone": user.contactPhone,
+    "permissionGroups": [
+      upg.permissionGroup.readable
+      for upg in user.permissionGroups
+    ],
+    "bookings": [
+      { "film": b.film_id, "datetime": b.datetime }
+      for b in user.bookings
+    ],
+  }
+
+
+def medianMs(login, username: str, password: str) -> float:
+  """Median milliseconds a login takes"""
+
+  times = []
+  for _ in range(ITERATIONS):
+    start = _TIME.perf_counter()
+    login(username, password)
+    times.append(_TIME.perf_counter() - start)
+
+    if sum(times) > MAX_SECONDS: break
+
+  return _STATISTICS.median(times) * 1000
+
+
+def main():
+  database = _dbClient.database
+  Booking = _dbClient.Tables.Booking
+
+  rows = []
+
+  with database.atomic() as transaction:
+    _dbClient.Tables.Film.get_or_create(title=FILM_TITLE)
+
+    for count in BOOKING_COUNTS:
+      username = f"benchmark-login-{count}"
+      user = _dbQueries.Tables.User.delete_then_create(username, "benchmark")
+
+      bookings = [
+        {
+          "user": user.id,
+          "film": FILM_TITLE,
+          "datetime": _DT(2025, 1, 1) + _TD(minutes=15 * i),
+        }
+        for i in range(count)
+      ]
+      for chunk in _PW.chunked(bookings, 1000):
+        Booking.insert_many(chunk).execute()
+
+      with _Utils.countStatements(database) as legacy:
+        legacyLogin(username, "benchmark")
+
+      with _Utils.countStatements(database) as current:
+        _Database.user__dataByAuth(username, "benchmark")
+
+      rows.append([
+        count,
+        f"{medianMs(legacyLogin, username, "benchmark"):.3f}",
+        len(legacy),
+        f"{medianMs(_Database.user__dataByAuth, username, "benchmark"):.3f}",
+        len(current),
+      ])
+
+    transaction.rollback()
+
+  print(f"Login latency (median of up to {ITERATIONS}) by the user's number of bookings")
+  _Utils.printTable(
+    ["#Bookings", "Before ms", "SQL", "After ms", "SQL"],
+    rows
+  )
+
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,118 @@
+import argparse as _ARGPARSE
+import json as _JSON
+import os as _OS
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import tempfile as _TEMPFILE
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks write and read throughput of the database with each of 
+the pragma profiles in `Config.PROFILES`.
+
+Each profile gets it's own temporary database, and runs in it's own process 
+because the database client is configured once, when it's imported.
+
+Read-only profiles can't write, so their database is filled using the 
+`throughput` profile first.
+"""
+
+
+
+def runWorker(phase: str, path: str, profile: str, count: int) -> dict:
+  """Run a phase of the benchmark in a new process, and return it's results"""
+
+  env = { **_OS.environ, "DTS_DB_PATH": path, "DTS_DB_PROFILE": profile }
+
+  if phase == "seed":
+    _SUBPROCESS.run(
+      [_SYS.executable, "-m", "project.database.seed"],
+      env=env, check=True
+    )
+    return {}
+
+  res = _SUBPROCESS.run(
+    [_SYS.executable, "-m", __spec__.name, "--worker", phase, "--count", str(count)],
+    env=env, check=True, capture_output=True, text=True
+  )
+  return _JSON.loads(res.stdout)
+
+
+def worker(phase: str, count: int):
+  """Time one phase against the database configured in the environment"""
+
+  from project.database import Database
+  from project.database.queries import Queries
+
+  userId = str(Queries.Tables.User.id_by_username("admin"))
+  filmTitles = Database.film__allTitles()
+
+  start = _TIME.perf_counter()
+
+  if phase == "write":
+    # One transaction per booking, so the cost of each commit is measured
+    for i in range(count):
+      Database.booking__create(
+        userId,
+        _DT(2026, 1, 1) + _TD(minutes=i),
+        filmTitles[i % len(filmTitles)],
+        ["ADULT", "CHILD"]
+      )
+
+  elif phase == "read":
+    for booking in Database.booking__iterAll(chunkSize=200):
+      pass
+    for _ in range(count // 10):
+      Database.booking__getPageByUserId(userId, limit=50)
+
+  elapsed = _TIME.perf_counter() - start
+  print(_JSON.dumps({ "seconds": elapsed, "opsPerSecond": count / elapsed }))
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--count", type=int, default=2000,
+    help="number of bookings to write / read")
+  parser.add_argument("--worker", choices=["write", "read"],
+    help=_ARGPARSE.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.worker is not None:
+    worker(args.worker, args.count)
+    return
+
+  from project.database.config import Config
+
+  rows = []
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    for profile, pragmas in Config.PROFILES.items():
+      path = _OS.path.join(directory, f"{profile}.db")
+      readOnly = bool(pragmas.get("query_only"))
+      writeProfile = "throughput" if readOnly else profile
+
+      runWorker("seed", path, writeProfile, args.count)
+      write = runWorker("write", path, writeProfile, args.count)
+      read = runWorker("read", path, profile, args.count)
+
+      writesPerSecond = write["opsPerSecond"]
+      readsPerSecond = read["opsPerSecond"]
+
+      rows.append([
+        profile,
+        "-" if readOnly else f"{writesPerSecond:.0f}",
+        f"{readsPerSecond:.0f}",
+      ])
+
+  print(f"Throughput with {args.count} bookings")
+  _Utils.printTable(["Profile", "Writes/s", "Reads/s"], rows)
+
+
+
+if __name__ == "__main__":
+  main()
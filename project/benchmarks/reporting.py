@@ -0,0 +1,143 @@
+import argparse as _ARGPARSE
+import json as _JSON
+import os as _OS
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import tempfile as _TEMPFILE
+import threading as _THREADING
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks how much admin listings delay bookings, with each
+reporting mode in `Config.REPORTING_MODES`.
+
+Reader threads list every booking (`Database.booking__iterAll`) over and over,
+while the main thread times bookings. Each mode runs in it's own process
+because the database client is configured once, when it's imported.
+"""
+
+
+
+RUNS = [
+  ("default", "off"),
+  ("default", "readonly"),
+  ("default", "snapshot"),
+  ("durable", "off"),
+  ("durable", "readonly"),
+  ("durable", "snapshot"),
+]
+"""`(profile, reporting mode)` of each run"""
+
+
+
+def worker(readers: int, count: int):
+  """Time bookings while reports run, against the configured database"""
+
+  from project.database import Database
+  from project.database.queries import Queries
+
+  userId = str(Queries.Tables.User.id_by_username("admin"))
+  filmTitle = Database.film__allTitles()[0]
+
+  stopping = _THREADING.Event()
+  reports = []
+
+  def report():
+    while not stopping.is_set():
+      for _ in Database.booking__iterAll(chunkSize=1000): pass
+      reports.append(1)
+
+  threads = [ _THREADING.Thread(target=report) for _ in range(readers) ]
+  for thread in threads: thread.start()
+
+  times = []
+  start = _TIME.perf_counter()
+
+  for i in range(count):
+    began = _TIME.perf_counter()
+    Database.booking__create(
+      userId, _DT(2026, 1, 1) + _TD(minutes=i), filmTitle, ["ADULT"]
+    )
+    times.append(_TIME.perf_counter() - began)
+
+  elapsed = _TIME.perf_counter() - start
+  stopping.set()
+  for thread in threads: thread.join()
+
+  times.sort()
+  print(_JSON.dumps({
+    "p50": times[len(times) // 2],
+    "p99": times[min(len(times) - 1, int(len(times) * 0.99))],
+    "max": times[-1],
+    "reportsPerSecond": len(reports) / elapsed,
+  }))
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--users", type=int, default=2000,
+    help="number of users to generate, with their bookings")
+  parser.add_argument("--readers", type=int, default=2,
+    help="number of threads listing bookings")
+  parser.add_argument("--count", type=int, default=200,
+    help="number of bookings to time")
+  parser.add_argument("--worker", action="store_true", help=_ARGPARSE.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.worker:
+    worker(args.readers, args.count)
+    return
+
+  rows = []
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    for profile, reporting in RUNS:
+      path = _OS.path.join(directory, f"{profile}-{reporting}.db")
+      env = {
+        **_OS.environ,
+        "DTS_DB_PATH": path,
+        "DTS_DB_PROFILE": profile,
+        "DTS_DB_REPORTING": reporting,
+        "DTS_DB_SNAPSHOT_INTERVAL": "1",
+      }
+
+      _SUBPROCESS.run(
+        [_SYS.executable, "-m", "project.database.generate",
+          "--users", str(args.users)],
+        env=env, check=True, capture_output=True
+      )
+
+      res = _SUBPROCESS.run(
+        [_SYS.executable, "-m", __spec__.name, "--worker",
+          "--readers", str(args.readers), "--count", str(args.count)],
+        env=env, check=True, capture_output=True, text=True
+      )
+      result = _JSON.loads(res.stdout)
+
+      rows.append([
+        profile,
+        reporting,
+        f"{result["p50"] * 1000:.2f}",
+        f"{result["p99"] * 1000:.2f}",
+        f"{result["max"] * 1000:.2f}",
+        f"{result["reportsPerSecond"]:.1f}",
+      ])
+
+  print(
+    f"Booking latency while {args.readers} threads list every booking "
+    f"({args.users} generated users)"
+  )
+  _Utils.printTable(
+    ["Profile", "Reporting", "p50 ms", "p99 ms", "Max ms", "Reports/s"],
+    rows
+  )
+
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,80 @@
+import argparse as _ARGPARSE
+import os as _OS
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import tempfile as _TEMPFILE
+import time as _TIME
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks how the sales reports scale with the number of worker
+processes (`Reports.parallelSales`), from 1 up to the number of cores.
+
+It generates a temporary database, times the report in this process, then with
+each number of workers, and checks every report matches the one made in this
+process. Starting the workers (each imports `pandas`) is included in the time,
+so small databases won't speed up.
+"""
+
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--users", type=int, default=20000,
+    help="number of users to generate, with their bookings")
+  parser.add_argument("--max-workers", type=int, default=_OS.cpu_count() or 1,
+    help="most worker processes to time")
+  parser.add_argument("--chunk-size", type=int, default=100_000,
+    help="tickets each process aggregates at a time")
+  args = parser.parse_args()
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    # The database client reads it's configuration when it's first imported,
+    # and the workers inherit the environment
+    _OS.environ["DTS_DB_PATH"] = _OS.path.join(directory, "reports.db")
+
+    _SUBPROCESS.run(
+      [_SYS.executable, "-m", "project.database.generate",
+        "--users", str(args.users)],
+      check=True, capture_output=True
+    )
+
+    from project.database.reports import Reports
+
+    start = _TIME.perf_counter()
+    expected = Reports.sales(chunkSize=args.chunk_size)
+    serial = _TIME.perf_counter() - start
+
+    tickets = int(expected.ticketsByHolderType["tickets"].sum())
+    rows = [["in process", f"{serial:.2f}", "1.00x", "yes"]]
+
+    for workers in range(1, args.max_workers + 1):
+      start = _TIME.perf_counter()
+      report = Reports.parallelSales(chunkSize=args.chunk_size, workers=workers)
+      elapsed = _TIME.perf_counter() - start
+
+      matches = all(
+        frame.equals(expectedFrame)
+        for frame, expectedFrame in zip(report, expected)
+      )
+
+      rows.append([
+        f"{workers} worker{"s" if workers > 1 else ""}",
+        f"{elapsed:.2f}",
+        f"{serial / elapsed:.2f}x",
+        "yes" if matches else "NO",
+      ])
+
+  print(
+    f"Sales report of {tickets} tickets ({args.users} generated users, "
+    f"{_OS.cpu_count()} cores)"
+  )
+  _Utils.printTable(["Run", "Seconds", "Speedup", "Matches"], rows)
+
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,191 @@
+import argparse as _ARGPARSE
+import json as _JSON
+import os as _OS
+import random as _RANDOM
+import statistics as _STATISTICS
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import tempfile as _TEMPFILE
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+from .showings import workerEnv as _workerEnv
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks allocating seats in large auditoriums, from many
+processes at once.
+
+For each auditorium size, a showing with a seat map is created and every
+worker process books `--bookings` groups of adjacent seats in it with
+`Database.booking__createForShowing`, timing each booking. Afterwards every
+booked seat must be unique, and match the seats taken in the seat map.
+
+It also times `SeatMap.bestAdjacent` on it's own (no database), on a seat map
+that is half taken at random.
+"""
+
+
+
+AUDITORIUMS = [(10, 20), (50, 100), (100, 200), (200, 500)]
+"""`(rows, seatsPerRow)` of each auditorium size"""
+
+
+
+def percentile(times: list[float], fraction: float) -> float:
+  """The time `fraction` of the way through the sorted times"""
+
+  times = sorted(times)
+  return times[min(len(times) - 1, int(len(times) * fraction))]
+
+
+def seatMapUs(rows: int, seatsPerRow: int, iterations: int = 2000) -> float:
+  """Median microseconds `bestAdjacent` takes on a half taken seat map"""
+
+  from project.database.seatmap import SeatMap
+
+  rng = _RANDOM.Random(0)
+  seatMap = SeatMap(rows, seatsPerRow)
+  seatMap.hold(rng.sample(range(seatMap.capacity), seatMap.capacity // 2))
+
+  times = []
+  for i in range(iterations):
+    count = i % 6 + 1
+
+    start = _TIME.perf_counter()
+    seatMap.bestAdjacent(count)
+    times.append(_TIME.perf_counter() - start)
+
+  return _STATISTICS.median(times) * 1_000_000
+
+
+def worker(showingId: str, seed: int, bookings: int, maxTickets: int):
+  """Book groups of seats in the showing, timing each booking"""
+
+  from project.database import Database
+  from project.database.queries import Queries
+
+  rng = _RANDOM.Random(seed)
+  userId = str(Queries.Tables.User.id_by_username("admin"))
+
+  times = []
+  for _ in range(bookings):
+    count = rng.randint(1, maxTickets)
+
+    start = _TIME.perf_counter()
+    bookingId = Database.booking__createForShowing(
+      userId, showingId, ["ADULT"] * count
+    )
+    times.append(_TIME.perf_counter() - start)
+
+    if bookingId is None: break  # no free seats together
+
+  print(_JSON.dumps({ "times": times }))
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--workers", type=int, default=4,
+    help="number of processes booking at once")
+  parser.add_argument("--bookings", type=int, default=100,
+    help="number of bookings each worker makes in each auditorium")
+  parser.add_argument("--max-tickets", type=int, default=6,
+    help="most tickets (adjacent seats) in one booking")
+  parser.add_argument("--worker", help=_ARGPARSE.SUPPRESS)
+  parser.add_argument("--seed", type=int, default=0, help=_ARGPARSE.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.worker is not None:
+    worker(args.worker, args.seed, args.bookings, args.max_tickets)
+    return
+
+  rows = []
+  failed = False
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    path = _OS.path.join(directory, "seats.db")
+    env = _workerEnv(path, busyTimeoutMs=5000)
+
+    _SUBPROCESS.run(
+      [_SYS.executable, "-m", "project.database.seed"], env=env, check=True
+    )
+
+    # The client is configured when it's imported, so only import it now the
+    # environment points at the temporary database
+    _OS.environ.update(env)
+    from project.database import Database
+    from project.database.client import dbClient
+    from project.database.queries import Queries
+
+    filmTitle = Database.film__allTitles()[0]
+
+    for i, (auditoriumRows, seatsPerRow) in enumerate(AUDITORIUMS):
+      capacity = auditoriumRows * seatsPerRow
+      showingId = Database.showing__create(
+        filmTitle, _DT(2030, 1, 1) + _TD(hours=i), capacity, seatsPerRow
+      )
+
+      processes = [
+        _SUBPROCESS.Popen(
+          [
+            _SYS.executable, "-m", __spec__.name,
+            "--worker", showingId,
+            "--seed", str(seed),
+            "--bookings", str(args.bookings),
+            "--max-tickets", str(args.max_tickets),
+          ],
+          env=env, stdout=_SUBPROCESS.PIPE, text=True
+        )
+        for seed in range(args.workers)
+      ]
+
+      times = []
+      for process in processes:
+        stdout, _ = process.communicate()
+        if process.returncode != 0:
+          raise RuntimeError(f"Worker failed with status {process.returncode}")
+        times += _JSON.loads(stdout)["times"]
+
+      with dbClient.connection():
+        showing = Queries.Tables.Showing.get_by_id(showingId)
+        seatMap = Queries.Tables.Showing.seat_map(showing)
+        booked = Queries.Tables.Showing.booked_seats(showingId)
+
+      if (
+        len(booked) != len(set(booked)) or
+        not all(seatMap.isTaken(seat) for seat in booked) or
+        len(booked) != seatMap.takenCount or
+        len(booked) != showing.capacity - showing.remaining
+      ):
+        failed = True
+        print(f"FAIL: seats were double booked in the {capacity} seat auditorium")
+
+      rows.append([
+        f"{auditoriumRows}x{seatsPerRow}",
+        capacity,
+        len(booked),
+        f"{percentile(times, 0.5) * 1000:.2f}",
+        f"{percentile(times, 0.95) * 1000:.2f}",
+        f"{percentile(times, 0.99) * 1000:.2f}",
+        f"{seatMapUs(auditoriumRows, seatsPerRow):.1f}",
+      ])
+
+  print(
+    f"Seat allocation latency, {args.workers} workers making "
+    f"{args.bookings} bookings each per auditorium"
+  )
+  _Utils.printTable(
+    ["Auditorium", "Seats", "Booked", "p50 ms", "p95 ms", "p99 ms", "bestAdjacent µs"],
+    rows
+  )
+
+  if failed: _SYS.exit(1)
+  print()
+  print("OK: no seats were double booked")
+
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,212 @@
+import argparse as _ARGPARSE
+import json as _JSON
+import os as _OS
+import random as _RANDOM
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import tempfile as _TEMPFILE
+import time as _TIME
+from datetime import datetime as _DT
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script stress tests booking seats for one showing from many processes at
+once, and checks the showing is never oversold.
+
+Every worker process books random numbers of tickets with
+`Database.booking__createForShowing` until the showing is sold out. Afterwards
+the tickets booked for the showing must add up to exactly the seats taken from
+it, and it can't have less than 0 seats left.
+
+The database is temporary, in WAL mode, with a short busy timeout so workers
+have to wait for each other's locks and retry.
+"""
+
+
+
+def workerEnv(path: str, busyTimeoutMs: int) -> dict:
+  """Environment variables that point a process at the temporary database"""
+
+  return {
+    **_OS.environ,
+    "DTS_DB_PATH": path,
+    "DTS_DB_PROFILE": "throughput",
+    "DTS_DB_PRAGMAS": f"busy_timeout={busyTimeoutMs}",
+  }
+
+
+def worker(showingId: str, seed: int, maxTickets: int):
+  """Book tickets for the showing until it's sold out"""
+
+  from project.database import Database
+  from project.database.client import dbClient
+  from project.database.queries import Queries
+
+  rng = _RANDOM.Random(seed)
+  userId = str(Queries.Tables.User.id_by_username("admin"))
+  ticketTypes = Database.ticketHolderType__allTypes()
+
+  bookings = tickets = rejected = busy = 0
+
+  start = _TIME.perf_counter()
+
+  # A booking can be rejected because there aren't enough seats left for it,
+  # so keep going until there aren't any seats left at all
+  while True:
+    count = rng.randint(1, maxTickets)
+    try:
+      bookingId = Database.booking__createForShowing(
+        userId, showingId, [ rng.choice(ticketTypes) for _ in range(count) ]
+      )
+    except Exception as error:
+      # Still busy after retrying for `retryOnBusy`'s whole timeout, nothing 
+      # was booked, so it counts as rejected
+      if not dbClient.isBusyError(error): raise
+      bookingId = None
+      busy += 1
+
+    if bookingId is not None:
+      bookings += 1
+      tickets += count
+      continue
+
+    rejected += 1
+    showing = Queries.Tables.Showing.get_by_id(showingId)
+    if showing.remaining == 0: break
+
+  elapsed = _TIME.perf_counter() - start
+  print(_JSON.dumps({
+    "bookings": bookings,
+    "tickets": tickets,
+    "rejected": rejected,
+    "busy": busy,
+    "busyRetries": dbClient.busyRetries,
+    "seconds": elapsed,
+  }))
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__)
+  parser.add_argument("--workers", type=int, default=8,
+    help="number of processes booking at once")
+  parser.add_argument("--capacity", type=int, default=2000,
+    help="number of seats in the showing")
+  parser.add_argument("--max-tickets", type=int, default=6,
+    help="most tickets in one booking")
+  parser.add_argument("--busy-timeout-ms", type=int, default=20,
+    help="how long SQLite waits for a lock before a worker has to retry")
+  parser.add_argument("--worker", help=_ARGPARSE.SUPPRESS)
+  parser.add_argument("--seed", type=int, default=0, help=_ARGPARSE.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.worker is not None:
+    worker(args.worker, args.seed, args.max_tickets)
+    return
+
+  with _TEMPFILE.TemporaryDirectory() as directory:
+    path = _OS.path.join(directory, "showings.db")
+    env = workerEnv(path, args.busy_timeout_ms)
+
+    _SUBPROCESS.run(
+      [_SYS.executable, "-m", "project.database.seed"], env=env, check=True
+    )
+
+    # The client is configured when it's imported, so only import it now the
+    # environment points at the temporary database
+    _OS.environ.update(env)
+    from project.database import Database
+    from project.database.client import dbClient
+    from project.database.queries import Queries
+
+    filmTitle = Database.film__allTitles()[0]
+    showingId = Database.showing__create(filmTitle, _DT(2030, 1, 1, 18), args.capacity)
+
+    start = _TIME.perf_counter()
+
+    processes = [
+      _SUBPROCESS.Popen(
+        [
+          _SYS.executable, "-m", __spec__.name,
+          "--worker", showingId,
+          "--seed", str(seed),
+          "--max-tickets", str(args.max_tickets),
+        ],
+        env=env, stdout=_SUBPROCESS.PIPE, text=True
+      )
+      for seed in range(args.workers)
+    ]
+
+    # A worker that crashes only loses it's own counts, the showing is still 
+    # checked
+    results = []
+    failed = 0
+    for process in processes:
+      stdout, _ = process.communicate()
+      if process.returncode != 0:
+        failed += 1
+        continue
+      results.append(_JSON.loads(stdout))
+
+    elapsed = _TIME.perf_counter() - start
+
+    with dbClient.connection():
+      showing = Queries.Tables.Showing.get_by_id(showingId)
+      booked = (dbClient.Tables.Ticket
+        .select()
+        .join(dbClient.Tables.Booking)
+        .where(dbClient.Tables.Booking.showing == showingId)
+        .count()
+      )
+
+  rows = [
+    [
+      i,
+      result["bookings"],
+      result["tickets"],
+      result["rejected"],
+      result["busy"],
+      result["busyRetries"],
+      f"{result["bookings"] / result["seconds"]:.0f}",
+    ]
+    for i, result in enumerate(results)
+  ]
+
+  bookings = sum(result["bookings"] for result in results)
+
+  print(f"{args.workers} workers booking a showing with {args.capacity} seats")
+  _Utils.printTable(
+    [
+      "Worker", "Bookings", "Tickets", "Rejected", "Still busy", "Busy retries",
+      "Bookings/s",
+    ],
+    rows
+  )
+  print()
+  print(f"Total: {bookings} bookings in {elapsed:.2f}s ({bookings / elapsed:.0f}/s)")
+  print(f"Seats: {booked} booked, {showing.remaining} left, of {showing.capacity}")
+
+  if failed > 0:
+    print(f"{failed} workers failed, their bookings are missing from the table")
+  else:
+    reported = sum(result["tickets"] for result in results)
+    if booked != reported:
+      print(f"Workers reported {reported} tickets, but {booked} were booked")
+
+  taken = showing.capacity - showing.remaining
+  if booked < taken:
+    print(f"{taken - booked} seats were taken without a ticket being booked")
+
+  # Only overselling fails the test
+  if showing.remaining < 0 or booked > taken:
+    print("FAIL: the showing was oversold")
+    _SYS.exit(1)
+
+  print("OK: the showing was not oversold")
+
+
+
+if __name__ == "__main__":
+  main()
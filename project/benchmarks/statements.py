@@ -0,0 +1,90 @@
+from datetime import datetime as _DT
+
+from project.database import Database as _Database
+from project.database.client import dbClient as _dbClient
+from project.database.queries import Queries as _dbQueries
+from project.database.schema.enums import ENUMs as _ENUMs
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks how many SQL statements it takes to create one booking 
+with N tickets.
+
+It compares the old read-before-write path (look up the film, then 
+`Booking.create`, then `Ticket.create` for every ticket) against 
+`Database.booking__create`.
+
+Everything runs inside a transaction that is rolled back, so the database is 
+left untouched.
+"""
+
+
+
+TICKET_COUNTS = [1, 2, 5, 10, 50]
+
+FILM_TITLE = "Benchmark Film"
+
+
+
+def legacyBookingCreate(userId: str, datetime: _DT, filmTitle: str, tickets):
+  """The booking write path before it used `Booking.create_with_tickets`"""
+
+  film = _dbQueries.Tables.Film.get_by_title(filmTitle)
+  if film is None: return None
+
+  booking = _dbQueries.Tables.Booking.create(userId, str(film.title), datetime)
+  if booking is None: return None
+
+  for ticket in tickets:
+    _dbQueries.Tables.Ticket.create(str(booking.id), ticket)
+
+
+def main():
+  database = _dbClient.database
+  ticketTypes = [type.name for type in _ENUMs.TicketHolderType_ENUM]
+
+  rows = []
+
+  with database.atomic() as transaction:
+    # Reference data the bookings depend on
+    for type in _ENUMs.TicketHolderType_ENUM:
+      _dbQueries.Tables.TicketHolderType.update_or_create(
+        id=type.value,
+        readable=type.name
+      )
+    _dbClient.Tables.Film.get_or_create(title=FILM_TITLE)
+    user = _dbQueries.Tables.User.delete_then_create("benchmark", "benchmark")
+    userId = str(user.id)
+
+    for count in TICKET_COUNTS:
+      tickets = [ticketTypes[i % len(ticketTypes)] for i in range(count)]
+
+      with _Utils.countStatements(database) as legacy:
+        legacyBookingCreate(userId, _DT.now(), FILM_TITLE, tickets)
+
+      with _Utils.countStatements(database) as current:
+        _Database.booking__create(userId, _DT.now(), FILM_TITLE, tickets)
+
+      rows.append([
+        count,
+        len(legacy),
+        sum(1 for sql in legacy if sql.startswith("SAVEPOINT")),
+        len(current),
+        sum(1 for sql in current if sql.startswith("SAVEPOINT")),
+      ])
+
+    transaction.rollback()
+
+  print("Statements per booking (including SAVEPOINT / RELEASE)")
+  _Utils.printTable(
+    ["#Tickets", "Before", "Savepoints", "After", "Savepoints"],
+    rows
+  )
+
+
+
+if __name__ == "__main__":
+  main()
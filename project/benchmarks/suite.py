@@ -0,0 +1,396 @@
+import argparse as _ARGPARSE
+import contextlib as _CONTEXTLIB
+import json as _JSON
+import os as _OS
+import platform as _PLATFORM
+import random as _RANDOM
+import sqlite3 as _SQLITE3
+import subprocess as _SUBPROCESS
+import tempfile as _TEMPFILE
+import time as _TIME
+import tracemalloc as _TRACEMALLOC
+import typing as _TYPING
+from datetime import datetime as _DT, timedelta as _TD
+
+from .utils import Utils as _Utils
+
+
+
+"""
+This script benchmarks every public method of `project.database.Database`.
+
+It generates a dataset with `project.database.generate` in a temporary
+database (or uses the one given with `--db`), then reports for each method:
+  - latency percentiles
+  - throughput
+  - SQL statements per call
+  - peak Python memory of one call
+
+The results are written to a JSON file, pass an older file to `--compare` to
+see what changed between commits.
+
+Write methods really write, so only point `--db` at a copy of a database.
+"""
+
+
+
+class Case:
+  """A benchmarked `Database` method"""
+
+  def __init__(
+    self,
+    name: str,
+    call: _TYPING.Callable[..., _TYPING.Any],
+    heavy: bool = False,
+    setup: _TYPING.Callable[[_RANDOM.Random], _TYPING.Any] | None = None,
+    teardown: _TYPING.Callable[[_TYPING.Any], _TYPING.Any] | None = None
+  ):
+    self.name = name
+    """Name of the `Database` method"""
+
+    self.call = call
+    """
+    Calls the method once with arguments picked using the random generator, 
+    and the result of `setup` if there is one
+    """
+
+    self.heavy = heavy
+    """Whether the method reads the whole table, so gets fewer iterations"""
+
+    self.setup = setup
+    """Prepares each call, without being measured"""
+
+    self.teardown = teardown
+    """Undoes each call given it's result, without being measured"""
+
+
+  def run(self, rng: _RANDOM.Random, measured: _TYPING.ContextManager):
+    """Call the method once, only measuring the call inside `measured`"""
+
+    args = () if self.setup is None else (self.setup(rng),)
+
+    with measured:
+      result = self.call(rng, *args)
+
+    if self.teardown is not None: self.teardown(result)
+
+
+
+def createCases(Database, users: list[tuple[str, str, str]], films: list[str]):
+  """The benchmark for each `Database` method"""
+
+  counter = iter(range(1_000_000_000))
+
+  def user(rng: _RANDOM.Random):
+    return rng.choice(users)
+
+  def tickets(rng: _RANDOM.Random):
+    types = ["ADULT", "TEENAGER", "CHILD", "STUDENT"]
+    return [rng.choice(types) for _ in range(rng.randint(1, 4))]
+
+  def datetime(rng: _RANDOM.Random):
+    return _DT(2025, 1, 1) + _TD(minutes=15 * rng.randrange(365 * 96))
+
+  def booking(rng: _RANDOM.Random):
+    return (user(rng)[0], datetime(rng), rng.choice(films), tickets(rng))
+
+  def showing(startsAt: _DT, capacity: int, seatsPerRow: int | None = None):
+    # Reuse the showing if an earlier run created it
+    return Database.showing__create(films[0], startsAt, capacity, seatsPerRow) or next(
+      showing["id"] for showing in Database.showing__getByFilm(films[0])
+      if showing["startsAt"] == startsAt
+    )
+
+  # A showing that never sells out
+  showingId = showing(_DT(2030, 1, 1), 1_000_000_000)
+  # A big auditorium with a seat map, holds are released straight away
+  seatedShowingId = showing(_DT(2030, 1, 2), 200 * 500, seatsPerRow=500)
+
+  return [
+    Case("user__dataById", lambda rng:
+      Database.user__dataById(user(rng)[0])),
+    Case("user__idByAuth", lambda rng:
+      Database.user__idByAuth(*user(rng)[1:])),
+    Case("user__dataByAuth", lambda rng:
+      Database.user__dataByAuth(*user(rng)[1:])),
+    Case("user__register", lambda rng:
+      Database.user__register(f"benchmark-user-{next(counter)}", "password")),
+
+    Case("booking__create", lambda rng:
+      Database.booking__create(*booking(rng))),
+    Case("booking__createMany", lambda rng:
+      Database.booking__createMany([booking(rng) for _ in range(100)])),
+    Case("booking__createForShowing", lambda rng:
+      Database.booking__createForShowing(user(rng)[0], showingId, tickets(rng))),
+    Case("booking__getAll", lambda rng:
+      Database.booking__getAll(), heavy=True),
+    Case("booking__getByUserId", lambda rng:
+      Database.booking__getByUserId(user(rng)[0])),
+    Case("booking__getSummaries", lambda rng:
+      Database.booking__getSummaries(), heavy=True),
+    Case("booking__getSummariesByUserId", lambda rng:
+      Database.booking__getSummariesByUserId(user(rng)[0])),
+    Case("booking__getSummariesPage", lambda rng:
+      Database.booking__getSummariesPage(limit=100)),
+    Case("booking__getSummariesPageByUserId", lambda rng:
+      Database.booking__getSummariesPageByUserId(user(rng)[0], limit=100)),
+    Case("booking__iterSummaries", lambda rng:
+      sum(1 for _ in Database.booking__iterSummaries()), heavy=True),
+    Case("booking__iterSummariesByUserId", lambda rng:
+      sum(1 for _ in Database.booking__iterSummariesByUserId(user(rng)[0]))),
+    Case("booking__getPage", lambda rng:
+      Database.booking__getPage(limit=100)),
+    Case("booking__getPageByUserId", lambda rng:
+      Database.booking__getPageByUserId(user(rng)[0], limit=100)),
+    Case("booking__iterAll", lambda rng:
+      sum(1 for _ in Database.booking__iterAll()), heavy=True),
+    Case("booking__iterByUserId", lambda rng:
+      sum(1 for _ in Database.booking__iterByUserId(user(rng)[0]))),
+
+    Case("film__allTitles", lambda rng:
+      Database.film__allTitles()),
+    Case("film__idByTitle", lambda rng:
+      Database.film__idByTitle(rng.choice(films))),
+
+    Case("showing__create", lambda rng:
+      Database.showing__create(rng.choice(films), datetime(rng), 100)),
+    Case("showing__getByFilm", lambda rng:
+      Database.showing__getByFilm(rng.choice(films))),
+    Case("showing__getSeatMap", lambda rng:
+      Database.showing__getSeatMap(seatedShowingId)),
+    Case("showing__holdSeats", lambda rng:
+      Database.showing__holdSeats(seatedShowingId, rng.randint(1, 6)),
+      teardown=lambda seats:
+        Database.showing__releaseSeats(seatedShowingId, seats)),
+    Case("showing__releaseSeats", lambda rng, seats:
+      Database.showing__releaseSeats(seatedShowingId, seats),
+      setup=lambda rng:
+        Database.showing__holdSeats(seatedShowingId, rng.randint(1, 6))),
+
+    Case("ticketHolderType__allTypes", lambda rng:
+      Database.ticketHolderType__allTypes()),
+
+    Case("report__sales", lambda rng:
+      Database.report__sales(), heavy=True),
+  ]
+
+
+def percentile(sortedValues: list[float], fraction: float) -> float:
+  """Nearest-rank percentile of already sorted values"""
+
+  index = min(len(sortedValues) - 1, int(fraction * len(sortedValues)))
+  return sortedValues[index]
+
+
+def measure(case: Case, iterations: int, rng: _RANDOM.Random, dbClient) -> dict:
+  """Run one case and summarise it's cost"""
+
+  # Warm up (connections, caches, ...)
+  case.run(rng, _CONTEXTLIB.nullcontext())
+
+  latencies: list[float] = []
+  statements = 0
+  elapsed = 0.0
+
+  @_CONTEXTLIB.contextmanager
+  def measured():
+    nonlocal statements, elapsed
+
+    # Reports read from the reporting connection, if there is one
+    with _Utils.countStatements(
+      dbClient.database, dbClient.reportingDatabase
+    ) as executed:
+      callStart = _TIME.perf_counter()
+      yield
+      latency = _TIME.perf_counter() - callStart
+
+    latencies.append(latency)
+    elapsed += latency
+    statements += len(executed)
+
+  for _ in range(iterations):
+    case.run(rng, measured())
+
+  # Measured separately because tracing allocations slows everything down
+  @_CONTEXTLIB.contextmanager
+  def traced():
+    _TRACEMALLOC.start()
+    try:
+      yield
+    finally:
+      nonlocal peakBytes
+      _, peakBytes = _TRACEMALLOC.get_traced_memory()
+      _TRACEMALLOC.stop()
+
+  peakBytes = 0
+  case.run(rng, traced())
+
+  latencies.sort()
+  return {
+    "iterations": iterations,
+    "p50Ms": percentile(latencies, 0.50) * 1000,
+    "p90Ms": percentile(latencies, 0.90) * 1000,
+    "p99Ms": percentile(latencies, 0.99) * 1000,
+    "maxMs": latencies[-1] * 1000,
+    "opsPerSecond": iterations / elapsed,
+    "statementsPerCall": statements / iterations,
+    "peakMemoryKiB": peakBytes / 1024,
+  }
+
+
+def gitCommit() -> str | None:
+  """The commit being benchmarked, if this is a git checkout"""
+
+  try:
+    res = _SUBPROCESS.run(
+      ["git", "rev-parse", "HEAD"],
+      capture_output=True, text=True, check=True
+    )
+    return res.stdout.strip()
+  except (OSError, _SUBPROCESS.CalledProcessError):
+    return None
+
+
+def compare(results: dict, previousPath: str):
+  """Print how much each method changed since a previous results file"""
+
+  with open(previousPath) as file:
+    previous = _JSON.load(file)["results"]
+
+  rows = []
+  for name, result in results.items():
+    if name not in previous: continue
+    before = previous[name]
+
+    rows.append([
+      name,
+      f"{before["p50Ms"]:.3f}",
+      f"{result["p50Ms"]:.3f}",
+      f"{(result["p50Ms"] / before["p50Ms"] - 1) * 100:+.0f}%",
+      f"{before["statementsPerCall"]:g}",
+      f"{result["statementsPerCall"]:g}",
+    ])
+
+  print(f"Compared with {previousPath}")
+  _Utils.printTable(
+    ["Method", "p50 before", "p50 after", "Change", "SQL before", "SQL after"],
+    rows
+  )
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(description=__doc__,
+    formatter_class=_ARGPARSE.RawDescriptionHelpFormatter)
+  parser.add_argument("--users", type=int, default=2000,
+    help="number of users in the generated dataset")
+  parser.add_argument("--bookings-per-user", type=float, default=5)
+  parser.add_argument("--db",
+    help="benchmark an existing database instead of generating one")
+  parser.add_argument("--profile", default=_OS.environ.get("DTS_DB_PROFILE", "default"),
+    help="pragma profile to open the database with")
+  parser.add_argument("--iterations", type=int, default=200)
+  parser.add_argument("--heavy-iterations", type=int, default=3,
+    help="iterations of methods that read every booking")
+  parser.add_argument("--only", nargs="*",
+    help="only benchmark these methods")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--output", default="benchmark-results.json")
+  parser.add_argument("--compare",
+    help="results file from an earlier run to compare with")
+  args = parser.parse_args()
+
+  directory = _TEMPFILE.TemporaryDirectory()
+  path = args.db or _OS.path.join(directory.name, "benchmark.db")
+
+  # The database client reads it's configuration when it's first imported
+  _OS.environ["DTS_DB_PATH"] = path
+  _OS.environ["DTS_DB_PROFILE"] = args.profile
+
+  from project.database import Database
+  from project.database.client import dbClient
+  from project.database.generate import Generator
+
+  if args.db is None:
+    print(f"Generating {args.users} users...")
+    Generator(
+      users=args.users,
+      bookingsPerUser=args.bookings_per_user,
+      seed=args.seed
+    ).run()
+
+  User = dbClient.Tables.User
+  users = [
+    (str(user.id), user.username, user.password)
+    for user in (User
+      .select(User.id, User.username, User.password)
+      .where(User.username.startswith(Generator.USERNAME_PREFIX))
+      .order_by(User.id)
+      .limit(1000)
+    )
+  ]
+  if len(users) == 0:
+    raise Exception("The database doesn't have any generated users")
+
+  cases = createCases(Database, users, Database.film__allTitles())
+
+  # Flag methods added to `Database` without a benchmark
+  benchmarked = { case.name for case in cases }
+  for name in dir(Database):
+    if "__" in name.strip("_") and name not in benchmarked:
+      if not name.startswith(("referenceCache__", "userCache__")):
+        print(f"Warning: Database.{name} has no benchmark")
+
+  rng = _RANDOM.Random(args.seed)
+  results = {}
+  rows = []
+
+  for case in cases:
+    if args.only and case.name not in args.only: continue
+
+    iterations = args.heavy_iterations if case.heavy else args.iterations
+    result = measure(case, iterations, rng, dbClient)
+    results[case.name] = result
+
+    rows.append([
+      case.name,
+      f"{result["p50Ms"]:.3f}",
+      f"{result["p90Ms"]:.3f}",
+      f"{result["p99Ms"]:.3f}",
+      f"{result["opsPerSecond"]:.0f}",
+      f"{result["statementsPerCall"]:g}",
+      f"{result["peakMemoryKiB"]:.0f}",
+    ])
+
+  _Utils.printTable(
+    ["Method", "p50 ms", "p90 ms", "p99 ms", "ops/s", "SQL/call", "Peak KiB"],
+    rows
+  )
+
+  output = {
+    "meta": {
+      "commit": gitCommit(),
+      "timestamp": _DT.now().isoformat(),
+      "python": _PLATFORM.python_version(),
+      "sqlite": _SQLITE3.sqlite_version,
+      "profile": args.profile,
+      "dataset": args.db or {
+        "users": args.users,
+        "bookingsPerUser": args.bookings_per_user,
+        "seed": args.seed,
+      },
+    },
+    "results": results,
+  }
+  with open(args.output, "w") as file:
+    _JSON.dump(output, file, indent=2)
+  print(f"Results written to {args.output}")
+
+  if args.compare:
+    compare(results, args.compare)
+
+  directory.cleanup()
+
+
+
+if __name__ == "__main__":
+  main()
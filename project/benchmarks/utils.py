@@ -0,0 +1,47 @@
+import contextlib as _CONTEXTLIB
+import peewee as _PW
+
+
+
+"""This script defines some utilities for the benchmarks module"""
+
+
+
+#region Utils
+
+class Utils:
+
+  @staticmethod
+  @_CONTEXTLIB.contextmanager
+  def countStatements(*databases: _PW.SqliteDatabase | None):
+    """
+    Context manager that records every SQL statement SQLite executes on this 
+    thread's connections to the databases (`None`s are skipped), including 
+    `BEGIN` / `SAVEPOINT` / `COMMIT`.
+
+    Yields the list the statements are appended to.
+    """
+
+    statements: list[str] = []
+
+    conns = [
+      database.connection() for database in databases if database is not None
+    ]
+    for conn in conns: conn.set_trace_callback(statements.append)
+    try:
+      yield statements
+    finally:
+      for conn in conns: conn.set_trace_callback(None)
+
+
+  @staticmethod
+  def printTable(headers: list[str], rows: list[list]):
+    """Print rows as a plain, right aligned text table"""
+
+    cells = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+
+    for row in cells:
+      print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+#endregion
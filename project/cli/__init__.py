@@ -1,10 +1,16 @@
+import typing as _TYPING
 from datetime import datetime as _DT
 
 from .utils import Utils as _Utils
 from .format import Format as _Format
 from .types import Types as _Types
 
-from project.database import Database as _Database
+# The database module (and `peewee`) is only imported when it's first used, so 
+# the first menu is shown sooner
+if _TYPING.TYPE_CHECKING:
+  from project.database import Database as _Database
+else:
+  _Database = _Utils.lazyImport("project.database", "Database")
 
 
 
@@ -120,7 +126,12 @@ def main():
     filmTitle, tickets = _Utils.optionSelect(filmOptions)
     if len(tickets) == 0: return
 
-    _Database.booking__create(user["id"], datetime, filmTitle, tickets)
+    bookingId = _Database.booking__create(user["id"], datetime, filmTitle, tickets)
+    if bookingId is None:
+      print("The booking couldn't be made, try again")
+    else:
+      print("Booking made")
+    print()
 
 
 
@@ -130,11 +141,9 @@ def main():
     global user
     if user is None: raise
 
-    bookings = _Database.booking__getByUserId(user["id"])
-    if len(bookings) < 1:
+    bookings = _Database.booking__iterSummariesByUserId(user["id"])
+    if _Format.bookingsTable(bookings) < 1:
       print("You haven't made any bookings yet.")
-    else:
-      print(_Format.bookingsTable(bookings))
     print()
 
 
@@ -146,11 +155,23 @@ def main():
     if user is None: raise
     if "ADMIN" not in user["permissionGroups"]: raise
 
-    bookings = _Database.booking__getAll()
-    if len(bookings) < 1:
+    bookings = _Database.booking__iterSummaries()
+    if _Format.bookingsTable(bookings) < 1:
       print("There aren't any bookings yet.")
-    else:
-      print(_Format.bookingsTable(bookings))
+    print()
+
+
+
+  def viewSalesReports():
+    """View revenue, ticket type and busiest time slot reports."""
+
+    global user
+    if user is None: raise
+    if "ADMIN" not in user["permissionGroups"]: raise
+
+    report = _Database.report__sales()
+    if _Format.salesReport(report) < 1:
+      print("There aren't any sales yet.")
     print()
 
   #endregion
@@ -178,7 +199,8 @@ def main():
 
       if ("ADMIN" in user["permissionGroups"]):
         options.update({
-          "View all bookings": viewAllBookings
+          "View all bookings": viewAllBookings,
+          "View sales reports": viewSalesReports,
         })
 
       options.update({
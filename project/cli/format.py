@@ -1,4 +1,8 @@
-import pandas as _PD
+import decimal as _DECIMAL
+import itertools as _ITERTOOLS
+import numbers as _NUMBERS
+import sys as _SYS
+import typing as _TYPING
 
 
 
@@ -10,24 +14,166 @@ import pandas as _PD
 
 class Format:
 
+  PAGER_PROMPT = "-- More (Enter for the next page, q to stop) --"
+
+  WEEKDAYS = [
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+  ]
+
+
+  @staticmethod
+  def table(
+    columns: list[str],
+    rows: _TYPING.Iterable[_TYPING.Sequence],
+    sampleSize: int = 100,
+    pager: bool | None = None,
+    file: _TYPING.TextIO | None = None,
+  ) -> int:
+    """
+    Print rows as a text table while they are consumed, so only a sample and
+    one page of rows are ever held in memory.
+
+    - `sampleSize`: number of rows the column widths are computed from, wider
+      cells in later rows are cut short
+    - `pager`: wait for the user after every screen of rows, by default only
+      when reading from and printing to a terminal
+
+    Returns the number of rows printed, nothing is printed if there are none.
+    """
+
+    file = file or _SYS.stdout
+    if pager is None:
+      pager = _SYS.stdin.isatty() and file.isatty()
+
+    rows = iter(rows)
+    sample = list(_ITERTOOLS.islice(rows, sampleSize))
+    if len(sample) == 0: return 0
+
+    # Numbers are right aligned, everything else is left aligned
+    rightAlign = [
+      all(isinstance(row[i], _NUMBERS.Number) for row in sample)
+      for i in range(len(columns))
+    ]
+    widths = [
+      max(len(column), *(len(str(row[i])) for row in sample))
+      for i, column in enumerate(columns)
+    ]
+
+    def formatRow(row: _TYPING.Sequence):
+      cells = []
+      for value, width, right in zip(row, widths, rightAlign):
+        cell = str(value)
+        if len(cell) > width: cell = cell[:width - 1] + "…"
+        cells.append(cell.rjust(width) if right else cell.ljust(width))
+      return "  ".join(cells).rstrip()
+
+    header = formatRow(columns)
+
+    # A page is a screen of rows with the pager, otherwise it's just how many
+    # rows are written at once
+    if pager:
+      import shutil as _SHUTIL  # imported here, it's slow and rarely needed
+      pageSize = max(1, _SHUTIL.get_terminal_size().lines - 2)
+    else:
+      pageSize = 1000
+
+    count = 0
+    lines = [header]
+
+    for row in _ITERTOOLS.chain(sample, rows):
+      lines.append(formatRow(row))
+      count += 1
+
+      if count % pageSize == 0:
+        file.write("\n".join(lines) + "\n")
+        file.flush()
+        lines = []
+
+        if pager:
+          if input(__class__.PAGER_PROMPT).strip().lower() == "q": return count
+          lines.append(header)
+
+    if len(lines) > 0 and lines != [header]:
+      file.write("\n".join(lines) + "\n")
+      file.flush()
+
+    return count
+
+
+  @staticmethod
+  def bookingsTable(
+    bookings: _TYPING.Iterable[dict],
+    pager: bool | None = None
+  ) -> int:
+    """
+    Print booking summaries as a table while they are consumed, see `table`.
+
+    Returns the number of bookings printed.
+    """
+
+    rows = (
+      (
+        booking["user"],
+        booking["film"],
+        booking["datetime"],
+        booking["ticketCount"],
+        booking["totalPaid"],
+      )
+      for booking in bookings
+    )
+
+    return __class__.table(
+      ["User", "Film", "Date Time", "#Tickets", "Cost (£)"], rows, pager=pager
+    )
+
   @staticmethod
-  def bookingsTable(bookings):
-    table = {
-      "User": [],
-      "Film": [],
-      "Date Time": [],
-      "#Tickets": [],
-      #"Cost": []
-    }
-
-    for booking in bookings:
-      table["User"].append(booking["user"])
-      table["Film"].append(booking["film"])
-      table["Date Time"].append(booking["datetime"])
-      table["#Tickets"].append(len(booking["tickets"]))
-      #table["Cost"].append()
-
-    df = _PD.DataFrame(table)
-    print(df)
+  def salesReport(report, busiestSlots: int = 10, pager: bool | None = None) -> int:
+    """
+    Print the tables of a sales report (see `project.database.reports`), only 
+    the `busiestSlots` busiest time slots are printed.
+
+    Returns the number of tickets sold, nothing is printed if there are none.
+    """
+
+    def pounds(pence) -> _DECIMAL.Decimal:
+      return _DECIMAL.Decimal(int(pence)).scaleb(-2)
+
+    tickets = int(report.ticketsByHolderType["tickets"].sum())
+    if tickets == 0: return 0
+
+    print("Tickets by type")
+    __class__.table(
+      ["Type", "#Tickets", "Revenue (£)"],
+      (
+        (holderType, int(count), pounds(pence))
+        for holderType, count, pence in report.ticketsByHolderType.itertuples()
+      ),
+      pager=False
+    )
+    print()
+
+    print("Busiest time slots")
+    __class__.table(
+      ["Day", "Time", "#Tickets", "#Bookings"],
+      (
+        (__class__.WEEKDAYS[weekday], f"{hour:02}:00", int(count), int(bookings))
+        for (weekday, hour), count, bookings
+        in report.busiestSlots.head(busiestSlots).itertuples()
+      ),
+      pager=False
+    )
+    print()
+
+    print("Revenue per film per day")
+    __class__.table(
+      ["Film", "Date", "#Tickets", "Revenue (£)"],
+      (
+        (film, day.date(), int(count), pounds(pence))
+        for (film, day), count, pence in report.revenueByFilmByDay.itertuples()
+      ),
+      pager=pager
+    )
+
+    return tickets
 
 #region
@@ -0,0 +1,128 @@
+import argparse as _ARGPARSE
+import statistics as _STATISTICS
+import subprocess as _SUBPROCESS
+import sys as _SYS
+import time as _TIME
+
+from .format import Format as _Format
+
+
+
+"""
+This script reports how long the cli takes to start, so a cold-start budget can
+be enforced, e.g. in CI:
+```
+uv run -m project --startup-report --budget-ms 50
+```
+
+Every measurement starts a new interpreter that imports the cli (everything
+that runs before the first menu is shown), and the time the interpreter takes
+to start on it's own is taken away.
+
+The report fails (exits with status 1) if the cli takes longer than the budget,
+or if it imports a module that should only be imported when it's used.
+"""
+
+
+
+DEFERRED_MODULES = ["project.database", "peewee", "sqlite3", "pandas"]
+"""Modules that must not be imported before the first menu is shown"""
+
+
+
+def timeCommand(args: list[str], runs: int) -> float:
+  """Median seconds a command takes to run"""
+
+  times = []
+  for _ in range(runs):
+    start = _TIME.perf_counter()
+    _SUBPROCESS.run(args, check=True)
+    times.append(_TIME.perf_counter() - start)
+
+  return _STATISTICS.median(times)
+
+
+def importTimes() -> list[tuple[str, int, int, int]]:
+  """
+  Every module the cli imports, as `(name, depth, selfUs, cumulativeUs)` in the
+  order `python -X importtime` reports them (children before their parent).
+  """
+
+  res = _SUBPROCESS.run(
+    [_SYS.executable, "-X", "importtime", "-c", "import project.cli"],
+    capture_output=True, text=True, check=True
+  )
+
+  modules = []
+  for line in res.stderr.splitlines():
+    if not line.startswith("import time:"): continue
+
+    selfUs, cumulativeUs, name = line.removeprefix("import time:").split("|")
+    if not selfUs.strip().isdigit(): continue  # the header
+
+    depth = (len(name) - len(name.lstrip()) - 1) // 2
+    modules.append((name.strip(), depth, int(selfUs), int(cumulativeUs)))
+
+  # Only keep what the cli imports, not what the interpreter imports on start
+  siteIndex = max(
+    i for i, (name, depth, *_) in enumerate(modules)
+    if name == "site" and depth == 0
+  )
+  return modules[siteIndex + 1:]
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(
+    prog="python -m project --startup-report",
+    description="Report how long the cli takes to start"
+  )
+  parser.add_argument("--startup-report", action="store_true")
+  parser.add_argument("--runs", type=int, default=7,
+    help="number of times to start the cli, the median is reported")
+  parser.add_argument("--budget-ms", type=float,
+    help="fail if the cli takes longer than this to start")
+  parser.add_argument("--top", type=int, default=10,
+    help="number of slowest imports to list")
+  args = parser.parse_args()
+
+  baseline = timeCommand([_SYS.executable, "-c", "pass"], args.runs)
+  total = timeCommand([_SYS.executable, "-c", "import project.cli"], args.runs)
+  startupMs = max(0.0, total - baseline) * 1000
+
+  modules = importTimes()
+
+  print(
+    f"Cli startup: {startupMs:.1f}ms "
+    f"(median of {args.runs} runs, {baseline * 1000:.1f}ms python start up "
+    f"not included)"
+  )
+  print()
+
+  print("Slowest imports (from python -X importtime):")
+  slowest = sorted(modules, key=lambda module: module[2], reverse=True)
+  _Format.table(
+    ["Module", "Self µs", "Cumulative µs"],
+    [
+      (name, selfUs, cumulativeUs)
+      for name, _, selfUs, cumulativeUs in slowest[:args.top]
+    ],
+    pager=False
+  )
+  print()
+
+  failed = False
+
+  imported = { name for name, *_ in modules }
+  early = [ name for name in DEFERRED_MODULES if name in imported ]
+  if len(early) > 0:
+    failed = True
+    print(f"FAIL: imported before the first menu: {", ".join(early)}")
+
+  if args.budget_ms is not None:
+    if startupMs > args.budget_ms:
+      failed = True
+      print(f"FAIL: over the {args.budget_ms:g}ms startup budget")
+    else:
+      print(f"OK: within the {args.budget_ms:g}ms startup budget")
+
+  _SYS.exit(1 if failed else 0)
@@ -1,3 +1,6 @@
+import importlib as _IMPORTLIB
+import typing as _TYPING
+
 from .types import Types as _Types
 
 
@@ -8,8 +11,37 @@ from .types import Types as _Types
 
 #region Utils
 
+class LazyImport:
+  """
+  Stand-in for an attribute of a module that is only imported the first time 
+  the stand-in is used, so importing heavy modules doesn't slow down startup.
+  """
+
+  def __init__(self, module: str, name: str):
+    self._module = module
+    self._name = name
+    self._value = None
+
+
+  def __getattr__(self, attr: str):
+    if self._value is None:
+      self._value = getattr(_IMPORTLIB.import_module(self._module), self._name)
+    return getattr(self._value, attr)
+
+
+
 class Utils:
 
+  @staticmethod
+  def lazyImport(module: str, name: str) -> _TYPING.Any:
+    """
+    Get a stand-in for `from <module> import <name>` that only imports the 
+    module the first time one of it's attributes is used.
+    """
+
+    return LazyImport(module, name)
+
+
   @staticmethod
   def optionsDictToList(options: _Types.optionDict) -> _Types.optionList:
     """
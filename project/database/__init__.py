@@ -1,6 +1,10 @@
+import decimal as _DECIMAL
 import peewee as _PW
+import typing as _TYPING
+import uuid as _UUID
 from datetime import datetime as _DT
 
+from .cache import refCache as _refCache, userCache as _userCache
 from .client import dbClient as _dbClient
 from .queries import Queries as _dbQueries
 
@@ -17,22 +21,357 @@ by authentication or otherwise.
 
 # region Utils
 
-def transformBookingData(booking):
-  return {
-    "user": booking.user.username,
-    "film": booking.film.title,
-    "datetime": booking.datetime,
-    "tickets": [
-      {
-        "holderName": ticket.holderName,
-        "type": ticket.holderType.readable.title(),
-        "paidPrice": f"£{ticket.paidPriceGBP}",
-      }
+class UserSession(dict):
+  """
+  The logged in user's data:
+  `{ "id", "username", "contactPhone", "permissionGroups", "bookings" }`
 
-      for ticket in booking.tickets
-    ]
+  `"bookings"` is only loaded the first time it is looked up (with 
+  `session["bookings"]` or `session.get("bookings")`), so logging in costs the 
+  same no matter how many bookings the user has made. `"bookings" in session` 
+  is always `True`, but `keys()`, `items()` and iterating only include it once 
+  it has been loaded.
+
+  Sessions from `AsyncDatabase` have their bookings loaded before they are 
+  returned, so looking them up never queries the database on the event loop.
+  """
+
+  def __contains__(self, key):
+    return key == "bookings" or super().__contains__(key)
+
+  def get(self, key, default=None):
+    if key == "bookings": return self["bookings"]
+    return super().get(key, default)
+
+  def __missing__(self, key):
+    if key != "bookings": raise KeyError(key)
+
+    Booking = _dbClient.Tables.Booking
+
+    with _dbClient.connection():
+      bookings = [
+        { "film": film, "datetime": datetime }
+        for film, datetime in (Booking
+          .select(Booking.film, Booking.datetime)
+          .where(Booking.user == self["id"])
+          .tuples()
+        )
+      ]
+
+    self["bookings"] = bookings
+    return bookings
+
+
+def selectUserSession(where) -> UserSession | None:
+  """
+  Get the session of the user matching the condition, with it's permission 
+  groups joined in the same query, or `None` if there isn't one.
+  """
+
+  Tables = _dbClient.Tables
+  User = Tables.User
+  UserPermissionGroups = Tables.UserPermissionGroups
+  PermissionGroup = Tables.PermissionGroup
+
+  rows = list(User
+    .select(User.id, User.username, User.contactPhone, PermissionGroup.readable)
+    .join(UserPermissionGroups, _PW.JOIN.LEFT_OUTER)
+    .join(PermissionGroup, _PW.JOIN.LEFT_OUTER)
+    .where(where)
+    .tuples()
+  )
+  if len(rows) == 0: return None
+
+  id, username, contactPhone, _ = rows[0]
+
+  return UserSession({
+    "id": id,
+    "username": username,
+    "contactPhone": contactPhone,
+    # A user without permission groups has a single row without a group
+    "permissionGroups": [ group for *_, group in rows if group is not None ],
+  })
+
+
+BookingCursor = tuple[_DT, _TYPING.Any]
+"""
+Position of the last booking on a page: it's `(datetime, id)`, which is the 
+order bookings are paginated in
+"""
+
+def bookingsAfter(after: BookingCursor):
+  """Condition for bookings that come after the cursor"""
+
+  Booking = _dbClient.Tables.Booking
+  afterDatetime, afterId = after
+
+  # SQLite can't seek the `(datetime, id)` index with just the `OR`, so the
+  # redundant `>=` is what stops every page scanning from the first booking
+  return (Booking.datetime >= afterDatetime) & (
+    (Booking.datetime > afterDatetime) |
+    (Booking.id > afterId)
+  )
+
+
+def bookingsScope(reporting: bool):
+  """
+  Scope for reading bookings: the reporting connection for reports (see 
+  `DBClient.reporting`), otherwise a transaction on the usual connection
+  """
+
+  return _dbClient.reporting() if reporting else _dbClient.transaction()
+
+
+def filterBookings(query, where, after: BookingCursor | None, limit: int | None):
+  """
+  Filter a query that joins other tables to `Booking` to the bookings matching 
+  the condition that come after the cursor, ordered by `(datetime, id)`.
+
+  With a limit, the page of bookings is picked in a subquery before the other 
+  tables are joined, otherwise the limit would count rows instead of bookings.
+  """
+
+  Booking = _dbClient.Tables.Booking
+
+  bookings = query if limit is None else Booking.select(Booking.id)
+
+  if where is not None:
+    bookings = bookings.where(where)
+
+  if after is not None:
+    bookings = bookings.where(bookingsAfter(after))
+
+  if limit is None:
+    query = bookings
+  else:
+    query = query.where(Booking.id.in_(bookings
+      .order_by(Booking.datetime, Booking.id)
+      .limit(limit)
+    ))
+
+  return query
+
+
+def holderTypeNames() -> dict[int, str]:
+  """The readable name of each ticket holder type, by it's id"""
+
+  return {
+    type.id: type.readable.title()
+    for type in _dbQueries.Tables.TicketHolderType.all_by_readable().values()
   }
 
+
+def selectBookings(
+  where,
+  after: BookingCursor | None = None,
+  limit: int | None = None,
+  reporting: bool = False
+):
+  """
+  Get bookings and their data, ordered by `(datetime, id)`:
+  `{ "user", "film", "datetime", "tickets": [{ "holderName", "type", "paidPrice" }] }`
+
+  The bookings, their users and tickets are loaded with one joined query 
+  (instead of prefetching each table), executed on the database of the scope, 
+  so reports can read from the reporting connection.
+
+  Pass `after` and `limit` to only get one keyset paginated page of bookings.
+
+  Returns the bookings and the cursor of the last one (`None` if there aren't 
+  any).
+  """
+
+  Tables = _dbClient.Tables
+  Booking = Tables.Booking
+  User = Tables.User
+  Ticket = Tables.Ticket
+
+  holderTypes = holderTypeNames()
+
+  query = (Booking
+    .select(
+      Booking.id,
+      User.username,
+      Booking.film,
+      Booking.datetime,
+      Ticket.holderName,
+      Ticket.holderType,
+      Ticket.paidPriceGBP,
+    )
+    .join(User)
+    .switch(Booking)
+    .join(Ticket, _PW.JOIN.LEFT_OUTER)
+  )
+
+  query = (filterBookings(query, where, after, limit)
+    .order_by(Booking.datetime, Booking.id)
+  )
+
+  bookings = []
+  lastId = None
+  last: BookingCursor | None = None
+
+  with bookingsScope(reporting) as database:
+    # Raw rows, converted here, like `selectBookingSummaries`
+    for id, username, film, datetime, holderName, holderType, paid in (
+      database.execute(query)
+    ):
+      # The rows of a booking are next to each other, one per ticket
+      if id != lastId:
+        lastId = id
+        booking = {
+          "user": username,
+          "film": film,
+          "datetime": _DT.fromisoformat(datetime),
+          "tickets": [],
+        }
+        bookings.append(booking)
+        last = (booking["datetime"], str(_UUID.UUID(id)))
+
+      # A booking without tickets has a single row without a ticket
+      if holderType is None: continue
+
+      booking["tickets"].append({
+        "holderName": holderName,
+        "type": holderTypes[holderType],
+        "paidPrice": f"£{Ticket.paidPriceGBP.python_value(paid)}",
+      })
+
+  return bookings, last
+
+
+def selectBookingSummaries(
+  where,
+  after: BookingCursor | None = None,
+  limit: int | None = None,
+  reporting: bool = False
+):
+  """
+  Get a summary of each booking, ordered by `(datetime, id)`:
+  `{ "id", "user", "film", "datetime", "ticketCount", "totalPaid", "ticketTypes" }`
+  where `ticketTypes` is the number of tickets of each holder type.
+
+  The tickets are counted and summed by SQLite with `GROUP BY`, so only one row
+  per booking and holder type is loaded instead of every ticket.
+
+  Pass `after` and `limit` to only get one keyset paginated page of bookings.
+
+  Returns the summaries and the cursor of the last one (`None` if there aren't 
+  any).
+  """
+
+  Tables = _dbClient.Tables
+  Booking = Tables.Booking
+  User = Tables.User
+  Ticket = Tables.Ticket
+
+  holderTypes = holderTypeNames()
+
+  query = (Booking
+    .select(
+      Booking.id,
+      User.username,
+      Booking.film,
+      Booking.datetime,
+      Ticket.holderType,
+      _PW.fn.COUNT(Ticket.id),
+      # Summed in pence so the total is exact
+      _PW.fn.SUM(_PW.fn.ROUND(Ticket.paidPriceGBP * 100)),
+    )
+    .join(User)
+    .switch(Booking)
+    .join(Ticket, _PW.JOIN.LEFT_OUTER)
+  )
+
+  query = (filterBookings(query, where, after, limit)
+    .group_by(Booking.id, Ticket.holderType)
+    .order_by(Booking.datetime, Booking.id)
+  )
+
+  summaries = []
+  lastId = None
+
+  with bookingsScope(reporting) as database:
+    # The raw rows are converted here instead of by `peewee`, so each booking's 
+    # id and date time is converted once instead of once per holder type
+    for id, username, film, datetime, holderType, count, pence in (
+      database.execute(query)
+    ):
+      # The rows of a booking are next to each other, one per holder type
+      if id != lastId:
+        lastId = id
+        summary = {
+          "id": str(_UUID.UUID(id)),
+          "user": username,
+          "film": film,
+          "datetime": _DT.fromisoformat(datetime),
+          "ticketCount": 0,
+          "totalPaid": _DECIMAL.Decimal(0).scaleb(-2),
+          "ticketTypes": {},
+        }
+        summaries.append(summary)
+
+      # A booking without tickets has a single row without a holder type
+      if holderType is None: continue
+
+      summary["ticketCount"] += count
+      summary["totalPaid"] += _DECIMAL.Decimal(int(pence)).scaleb(-2)
+      summary["ticketTypes"][holderTypes[holderType]] = count
+
+  last: BookingCursor | None = None
+  if summaries:
+    last = (summaries[-1]["datetime"], summaries[-1]["id"])
+
+  return summaries, last
+
+
+def selectPage(
+  select: _TYPING.Callable[..., tuple[list, BookingCursor | None]],
+  where,
+  after: BookingCursor | None,
+  limit: int,
+  reporting: bool = False
+):
+  """
+  Get one keyset paginated page of bookings, ordered by `(datetime, id)`, with 
+  `select` (`selectBookings` or `selectBookingSummaries`).
+
+  The page starts after the `after` cursor instead of using `OFFSET`, so every 
+  page costs the same no matter how deep into the table it is.
+
+  Returns the page and the cursor of the next page (`None` if this is the last 
+  page).
+  """
+
+  if limit < 1:
+    raise ValueError(f"The page limit must be at least 1, got {limit}")
+
+  page, last = select(where, after, limit, reporting)
+
+  cursor = last if len(page) == limit else None
+
+  return page, cursor
+
+
+def streamPages(
+  select: _TYPING.Callable[..., tuple[list, BookingCursor | None]],
+  where,
+  chunkSize: int,
+  reporting: bool = False
+):
+  """
+  Generator that yields what `select` gets (see `selectPage`) one page of 
+  `chunkSize` bookings at a time, so only one page is ever held in memory.
+  """
+
+  cursor: BookingCursor | None = None
+
+  while True:
+    page, cursor = selectPage(select, where, cursor, chunkSize, reporting)
+    yield from page
+
+    if cursor is None: break
+
 # endregion
 
 
@@ -46,43 +385,29 @@ class Database:
   #region User
 
   @staticmethod
+  @_dbClient.connection()
   def user__dataById(id: str):
     """
-    Get the user's data given the entry's id.
-    """
+    Get the user's session given the entry's id, their bookings are only 
+    loaded when `session["bookings"]` is first looked up.
 
-    Tables = _dbClient.Tables
-    User = Tables.User
-    UserPermissionGroups = Tables.UserPermissionGroups
-    PermissionGroup = Tables.PermissionGroup
-    Booking = Tables.Booking
+    The user's identity and permission groups are served from the user cache.
+    """
 
-    res = (User
-      .select(User.id, User.username, User.contactPhone)
-      .where(User.id == id)
-      .prefetch(UserPermissionGroups, PermissionGroup, Booking)
-    )
-    if len(res) != 1: raise Exception()
-    user = res[0]
+    User = _dbClient.Tables.User
+    userId = _UUID.UUID(str(id))
 
-    permissionGroups = [
-      upg.permissionGroup.readable
-      for upg in user.permissionGroups
-    ]
-    bookings = [
-      { "film": b.film_id, "datetime": b.datetime }
-      for b in user.bookings
-    ]
+    cached = _userCache.get(userId, lambda: selectUserSession(User.id == userId))
+    if cached is None: raise Exception()
 
-    return {
-      "id": user.id,
-      "username": user.username,
-      "contactPhone": user.contactPhone,
-      "permissionGroups": permissionGroups,
-      "bookings": bookings,
-    }
+    # A copy, so the cached session never gets bookings or changes
+    return UserSession({
+      **cached,
+      "permissionGroups": list(cached["permissionGroups"]),
+    })
 
   @staticmethod
+  @_dbClient.connection()
   def user__idByAuth(username: str, password: str):
     """
     Return the id of the entry in the User table with the given username and 
@@ -101,17 +426,22 @@ class Database:
       return None
 
   @staticmethod
+  @_dbClient.connection()
   def user__dataByAuth(username: str, password: str):
     """
-    Get the user's data given their username and password.
+    Get the user's session given their username and password, their bookings 
+    are only loaded when `session["bookings"]` is first looked up.
     """
 
-    userId = __class__.user__idByAuth(username, password)
-    if userId is None: return None
+    User = _dbClient.Tables.User
 
-    return __class__.user__dataById(userId)
+    return selectUserSession(
+      (User.username == username) &
+      (User.password == password)
+    )
 
   @staticmethod
+  @_dbClient.connection()
   def user__register(username: str, password: str):
     """
     Register a new user.
@@ -120,7 +450,9 @@ class Database:
     user = _dbQueries.Tables.User.create(username, password)
     if user is None: return None
 
-    return __class__.user__dataById(str(user.id))
+    User = _dbClient.Tables.User
+
+    return selectUserSession(User.id == user.id)
 
   #endregion
 
@@ -128,67 +460,224 @@ class Database:
   #region Booking
 
   @staticmethod
-  @_dbClient.database.atomic()
+  @_dbClient.connection()
   def booking__create(userId: str, datetime: _DT, filmTitle: str, tickets):
     """
     Create a booking and tickets.
     """
 
-    film = _dbQueries.Tables.Film.get_by_title(filmTitle)
-    if film is None: return None
-
-    booking = _dbQueries.Tables.Booking.create(userId, str(film.title), datetime)
+    # The id of a film is it's title, so we can insert it directly and let the
+    # foreign key constraint reject unknown films
+    booking = _dbQueries.Tables.Booking.create_with_tickets(
+      userId, filmTitle, datetime, tickets
+    )
     if booking is None: return None
 
-    for ticket in tickets:
-      _dbQueries.Tables.Ticket.create(str(booking.id), ticket)
+    return str(booking.id)
 
   @staticmethod
-  @_dbClient.database.atomic()
-  def booking__getAll():
+  @_dbClient.connection()
+  def booking__createForShowing(
+    userId: str, showingId: str, tickets, seats: list[int] | None = None
+  ):
+    """
+    Create a booking and tickets for a showing, taking a seat for each ticket.
+
+    If the showing has a seat map, the tickets get the held `seats` if they're 
+    given, otherwise the best free seats next to each other.
+
+    Returns the booking's id, or `None` if the showing doesn't have enough 
+    seats left or the seats aren't held.
     """
-    Get every booking and it's data.
+
+    booking = _dbQueries.Tables.Booking.create_for_showing(
+      userId, showingId, tickets, seats
+    )
+    if booking is None: return None
+
+    return str(booking.id)
+
+  @staticmethod
+  @_dbClient.connection()
+  def booking__createMany(
+    records: _TYPING.Iterable[tuple[str, _DT, str, list[str]]],
+    chunkSize: int = 500,
+    transactions: int = 1
+  ):
     """
+    Create many bookings and their tickets at once, e.g. for group or reseller
+    imports.
+
+    Each record is a `(userId, datetime, filmTitle, tickets)` tuple.
 
-    Tables = _dbClient.Tables
-    Booking = Tables.Booking
-    User = Tables.User
-    Film = Tables.Film
-    Ticket = Tables.Ticket
-    TicketHolderType = Tables.TicketHolderType
+    Returns a result for each record, in order:
+    `{ "bookingId": str | None, "error": str | None }`
+    """
 
-    res = (Booking
-      .select(Booking)
-      .prefetch(User, Film, Ticket, TicketHolderType)
+    return _dbQueries.Tables.Booking.create_many(
+      records, chunkSize=chunkSize, transactions=transactions
     )
 
-    bookings = [ transformBookingData(booking) for booking in res ]
+  @staticmethod
+  def booking__getAll():
+    """
+    Get every booking and it's data, ordered by date time.
+
+    Read from the reporting connection, see `DBClient.reporting`.
+    """
+
+    bookings, _ = selectBookings(None, reporting=True)
 
     return bookings
 
   @staticmethod
-  @_dbClient.database.atomic()
   def booking__getByUserId(userId: str):
     """
-    Get user's booking and it's data.
+    Get user's booking and it's data, ordered by date time.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    bookings, _ = selectBookings(Booking.user == userId)
+
+    return bookings
+
+  @staticmethod
+  def booking__getSummaries():
+    """
+    Get a summary of every booking, ordered by date time: it's ticket count,
+    total paid and number of tickets of each type, without it's tickets.
+
+    Read from the reporting connection, see `DBClient.reporting`.
+    """
+
+    summaries, _ = selectBookingSummaries(None, reporting=True)
+
+    return summaries
+
+  @staticmethod
+  def booking__getSummariesByUserId(userId: str):
+    """
+    Get a summary of the user's bookings, ordered by date time: their ticket
+    count, total paid and number of tickets of each type, without their
+    tickets.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    summaries, _ = selectBookingSummaries(Booking.user == userId)
+
+    return summaries
+
+  @staticmethod
+  def booking__getSummariesPage(
+    after: BookingCursor | None = None, limit: int = 100
+  ):
+    """
+    Get one page of booking summaries, ordered by date time.
+
+    Pass the returned cursor as `after` to get the next page, the cursor is 
+    `None` once there are no more pages.
+
+    Read from the reporting connection, see `DBClient.reporting`.
     """
 
-    Tables = _dbClient.Tables
-    Booking = Tables.Booking
-    User = Tables.User
-    Film = Tables.Film
-    Ticket = Tables.Ticket
-    TicketHolderType = Tables.TicketHolderType
+    return selectPage(
+      selectBookingSummaries, None, after, limit, reporting=True
+    )
+
+  @staticmethod
+  def booking__getSummariesPageByUserId(
+    userId: str, after: BookingCursor | None = None, limit: int = 100
+  ):
+    """
+    Get one page of the user's booking summaries, ordered by date time.
 
-    res = (Booking
-      .select(Booking)
-      .where(Booking.user == userId)
-      .prefetch(User, Film, Ticket, TicketHolderType)
+    Pass the returned cursor as `after` to get the next page, the cursor is 
+    `None` once there are no more pages.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    return selectPage(
+      selectBookingSummaries, Booking.user == userId, after, limit
     )
 
-    bookings = [ transformBookingData(booking) for booking in res ]
+  @staticmethod
+  def booking__iterSummaries(chunkSize: int = 500):
+    """
+    Generator that yields a summary of every booking, ordered by date time, 
+    loading `chunkSize` bookings at a time.
+
+    Read from the reporting connection, see `DBClient.reporting`.
+    """
 
-    return bookings
+    return streamPages(
+      selectBookingSummaries, None, chunkSize, reporting=True
+    )
+
+  @staticmethod
+  def booking__iterSummariesByUserId(userId: str, chunkSize: int = 500):
+    """
+    Generator that yields a summary of the user's bookings, ordered by date 
+    time, loading `chunkSize` bookings at a time.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    return streamPages(
+      selectBookingSummaries, Booking.user == userId, chunkSize
+    )
+
+  @staticmethod
+  def booking__getPage(after: BookingCursor | None = None, limit: int = 100):
+    """
+    Get one page of bookings and their data, ordered by date time.
+
+    Pass the returned cursor as `after` to get the next page, the cursor is 
+    `None` once there are no more pages.
+
+    Read from the reporting connection, see `DBClient.reporting`.
+    """
+
+    return selectPage(selectBookings, None, after, limit, reporting=True)
+
+  @staticmethod
+  def booking__getPageByUserId(
+    userId: str, after: BookingCursor | None = None, limit: int = 100
+  ):
+    """
+    Get one page of the user's bookings and their data, ordered by date time.
+
+    Pass the returned cursor as `after` to get the next page, the cursor is 
+    `None` once there are no more pages.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    return selectPage(selectBookings, Booking.user == userId, after, limit)
+
+  @staticmethod
+  def booking__iterAll(chunkSize: int = 500):
+    """
+    Generator that yields every booking and it's data, ordered by date time, 
+    loading `chunkSize` bookings at a time.
+
+    Read from the reporting connection, see `DBClient.reporting`.
+    """
+
+    return streamPages(selectBookings, None, chunkSize, reporting=True)
+
+  @staticmethod
+  def booking__iterByUserId(userId: str, chunkSize: int = 500):
+    """
+    Generator that yields the user's bookings and their data, ordered by date 
+    time, loading `chunkSize` bookings at a time.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    return streamPages(selectBookings, Booking.user == userId, chunkSize)
 
   #endregion
 
@@ -196,14 +685,16 @@ class Database:
   #region Film
 
   @staticmethod
+  @_dbClient.connection()
   def film__allTitles():
     """
     Get every film title.
     """
 
-    return [ film.title for film in _dbClient.Tables.Film.select() ]
+    return list(_dbQueries.Tables.Film.all_by_title().keys())
   
   @staticmethod
+  @_dbClient.connection()
   def film__idByTitle(title: str):
     """
     Return the id of the entry in the Film table with the given title.
@@ -219,14 +710,189 @@ class Database:
   #endregion
 
 
+  #region Showing
+
+  @staticmethod
+  @_dbClient.connection()
+  def showing__create(
+    filmTitle: str,
+    startsAt: _DT,
+    capacity: int,
+    seatsPerRow: int | None = None
+  ):
+    """
+    Create a showing of a film with `capacity` seats, in rows of `seatsPerRow` 
+    seats if it's given (so seats are allocated to tickets).
+
+    Returns the showing's id, or `None` if the film doesn't exist or is 
+    already showing at that time.
+    """
+
+    showing = _dbQueries.Tables.Showing.create(
+      filmTitle, startsAt, capacity, seatsPerRow
+    )
+    if showing is None: return None
+
+    return str(showing.id)
+
+  @staticmethod
+  @_dbClient.connection()
+  def showing__getByFilm(filmTitle: str, after: _DT | None = None):
+    """
+    Get the film's showings (and how many seats they have left) in date 
+    order, only those starting after `after` if it's given.
+    """
+
+    return [
+      {
+        "id": str(showing.id),
+        "film": showing.film_id,
+        "startsAt": showing.startsAt,
+        "capacity": showing.capacity,
+        "remaining": showing.remaining,
+        "seatsPerRow": showing.seatsPerRow,
+      }
+      for showing in _dbQueries.Tables.Showing.all_by_film(filmTitle, after)
+    ]
+
+  @staticmethod
+  @_dbClient.connection()
+  def showing__getSeatMap(showingId: str):
+    """
+    Get the showing's seat map: its layout, the seats that are taken (held or 
+    booked) and the seats that are booked.
+
+    Returns `None` if the showing doesn't exist or has unallocated seating.
+    """
+
+    try:
+      showing = _dbQueries.Tables.Showing.get_by_id(showingId)
+    except ValueError:  # invalid showing id
+      return None
+    if showing is None: return None
+
+    seatMap = _dbQueries.Tables.Showing.seat_map(showing)
+    if seatMap is None: return None
+
+    return {
+      "rows": seatMap.rows,
+      "seatsPerRow": seatMap.seatsPerRow,
+      "taken": seatMap.takenSeats(),
+      "booked": sorted(_dbQueries.Tables.Showing.booked_seats(showingId)),
+    }
+
+  @staticmethod
+  @_dbClient.connection()
+  def showing__holdSeats(showingId: str, count: int):
+    """
+    Hold the best `count` free seats next to each other, to book them with 
+    `booking__createForShowing` later, or free them with 
+    `showing__releaseSeats`.
+
+    Returns the seats, or `None` if the showing doesn't have a seat map or 
+    enough free seats together.
+    """
+
+    return _dbQueries.Tables.Showing.hold_seats(showingId, count)
+
+  @staticmethod
+  @_dbClient.connection()
+  def showing__releaseSeats(showingId: str, seats: list[int]):
+    """
+    Free held seats (booked seats stay taken).
+
+    Returns the number of seats freed.
+    """
+
+    return _dbQueries.Tables.Showing.release_seats(showingId, seats)
+
+  #endregion
+
+
   #region TicketHolderType
 
   @staticmethod
+  @_dbClient.connection()
   def ticketHolderType__allTypes():
     """
     Get every ticket holder type.
     """
 
-    return [ tType.readable for tType in _dbClient.Tables.TicketHolderType.select() ]
+    return list(_dbQueries.Tables.TicketHolderType.all_by_readable().keys())
+
+  #endregion
+
+
+  #region Report
+
+  @staticmethod
+  def report__sales(
+    start: _DT | None = None,
+    end: _DT | None = None,
+    chunkSize: int = 100_000,
+    workers: int | None = None
+  ):
+    """
+    Get the sales reports as DataFrames: revenue per film per day, tickets by 
+    holder type, and the busiest time slots. Only bookings from `start` to 
+    `end` are included if they're given.
+
+    The tickets are aggregated a chunk of `chunkSize` at a time, see 
+    `reports.py`. Read from the reporting connection, see 
+    `DBClient.reporting`. Split across `workers` processes, 
+    `config.reportWorkers` by default.
+    """
+
+    # `pandas` is slow to import, so it's only imported when a report is run
+    from .reports import Reports
+
+    if workers is None: workers = _dbClient.config.reportWorkers
+
+    return Reports.sales(start, end, chunkSize, workers)
+
+  #endregion
+
+
+  #region Cache
+
+  @staticmethod
+  def userCache__stats():
+    """
+    Get the size and hit / miss counters of the user data cache.
+    """
+
+    return _userCache.stats()
+
+  @staticmethod
+  def userCache__invalidate(*userIds: str):
+    """
+    Drop the cached data of the given users, or of every user if none are 
+    given.
+
+    Only needed if users or their permission groups are written to outside of 
+    the `queries` module.
+    """
+
+    _userCache.invalidate(*(_UUID.UUID(str(id)) for id in userIds))
+
+  @staticmethod
+  def referenceCache__stats():
+    """
+    Get the hit / miss counters of the reference data cache.
+    """
+
+    return _refCache.stats()
+
+  @staticmethod
+  def referenceCache__invalidate(*tables: str):
+    """
+    Drop cached reference data for the given tables (e.g. `"Film"`), or for 
+    every table if none are given.
+
+    Only needed if reference tables are written to outside of the `queries` 
+    module.
+    """
+
+    _refCache.invalidate(*tables)
 
   #endregion
@@ -0,0 +1,247 @@
+import asyncio as _ASYNCIO
+import concurrent.futures as _FUTURES
+import functools as _FUNCTOOLS
+import typing as _TYPING
+
+from . import Database as _Database, BookingCursor as _BookingCursor
+from .client import dbClient as _dbClient
+
+
+
+"""
+This script defines an `asyncio` facade over the `Database` class, so it can be
+used from async code without blocking the event loop.
+
+Every call runs in a worker thread, and every worker thread has it's own
+connection (`peewee` keeps connections per thread), or checks one out of the
+pool for each call if `DTS_DB_POOL_SIZE` is set:
+  - reads run on a pool of reader threads, so they run side by side
+  - writes run on a single writer thread, so they never wait on each other for
+    SQLite's write lock
+
+Readers only run alongside the writer in WAL mode, so use the `durable` or
+`throughput` database profile.
+
+The user sessions returned here already have their bookings loaded (on the
+worker thread), unlike the sync ones, as looking them up later would query the
+database on the event loop.
+"""
+
+
+
+def _connect():
+  """
+  Open this worker thread's connection as soon as the thread starts. 
+
+  Pooled connections are left to each call, as a thread holding one for it's 
+  whole life would never return it and drain the pool.
+  """
+
+  if _dbClient.pooled: return
+
+  _dbClient.database.connect(reuse_if_open=True)
+
+
+def _loadBookings(method: _TYPING.Callable):
+  """
+  Wrap a `Database` method that returns a `UserSession` (or `None`) so the 
+  session's bookings are loaded by the thread calling it
+  """
+
+  @_FUNCTOOLS.wraps(method)
+  def wrapper(*args, **kwargs):
+    session = method(*args, **kwargs)
+    if session is not None: session["bookings"]
+    return session
+
+  return wrapper
+
+
+def _delegate(name: str, write: bool = False, session: bool = False):
+  """
+  Create a coroutine method that runs the `Database` method in a worker. 
+
+  Pass `session` for methods that return a `UserSession`, to load it's 
+  bookings in the worker too.
+  """
+
+  method = getattr(_Database, name)
+  function = _loadBookings(method) if session else method
+
+  async def coroutine(self: "AsyncDatabase", *args, **kwargs):
+    return await self._run(write, function, *args, **kwargs)
+
+  coroutine.__name__ = name
+  coroutine.__qualname__ = f"AsyncDatabase.{name}"
+  coroutine.__doc__ = method.__doc__
+  return coroutine
+
+
+
+async def _iterPages(getPage: _TYPING.Callable, *args, chunkSize: int):
+  """
+  Async generator that yields everything on the pages `getPage` gets, passing 
+  it `args`, then the cursor of the previous page and `chunkSize` as the limit
+  """
+
+  cursor: _BookingCursor | None = None
+  while True:
+    page, cursor = await getPage(*args, cursor, chunkSize)
+    for item in page:
+      yield item
+
+    if cursor is None: break
+
+
+
+class AsyncDatabase:
+  """
+  `asyncio` counterpart of `Database`, every method is a coroutine.
+
+  Use it as an async context manager, or call `close()` when finished.
+  """
+
+  def __init__(self, readers: int = 4, maxPending: int = 256):
+    """
+    - `readers`: number of reader threads (and connections)
+    - `maxPending`: most calls that can be queued or running at once, callers
+      past this wait for a free slot
+    """
+
+    self._readers = _FUTURES.ThreadPoolExecutor(
+      max_workers=readers,
+      thread_name_prefix="db-reader",
+      initializer=_connect,
+    )
+    self._writer = _FUTURES.ThreadPoolExecutor(
+      max_workers=1,
+      thread_name_prefix="db-writer",
+      initializer=_connect,
+    )
+
+    self._pending = _ASYNCIO.Semaphore(maxPending)
+
+
+  async def _run(self, write: bool, function: _TYPING.Callable, *args, **kwargs):
+    """Run a blocking function on the writer thread or a reader thread"""
+
+    executor = self._writer if write else self._readers
+
+    async with self._pending:
+      loop = _ASYNCIO.get_running_loop()
+      return await loop.run_in_executor(
+        executor, _FUNCTOOLS.partial(function, *args, **kwargs)
+      )
+
+
+  async def close(self):
+    """Wait for running calls to finish, then stop the worker threads"""
+
+    loop = _ASYNCIO.get_running_loop()
+    await loop.run_in_executor(None, self._readers.shutdown)
+    await loop.run_in_executor(None, self._writer.shutdown)
+
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *_):
+    await self.close()
+
+
+  #region User
+
+  user__dataById = _delegate("user__dataById", session=True)
+  user__idByAuth = _delegate("user__idByAuth")
+  user__dataByAuth = _delegate("user__dataByAuth", session=True)
+  user__register = _delegate("user__register", write=True, session=True)
+
+  #endregion
+
+
+  #region Booking
+
+  booking__create = _delegate("booking__create", write=True)
+  booking__createMany = _delegate("booking__createMany", write=True)
+  booking__createForShowing = _delegate("booking__createForShowing", write=True)
+  booking__getAll = _delegate("booking__getAll")
+  booking__getByUserId = _delegate("booking__getByUserId")
+  booking__getSummaries = _delegate("booking__getSummaries")
+  booking__getSummariesByUserId = _delegate("booking__getSummariesByUserId")
+  booking__getPage = _delegate("booking__getPage")
+  booking__getPageByUserId = _delegate("booking__getPageByUserId")
+  booking__getSummariesPage = _delegate("booking__getSummariesPage")
+  booking__getSummariesPageByUserId = _delegate(
+    "booking__getSummariesPageByUserId"
+  )
+
+  def booking__iterAll(self, chunkSize: int = 500):
+    """
+    Async generator that yields every booking and it's data, ordered by date
+    time, loading `chunkSize` bookings at a time.
+    """
+
+    return _iterPages(self.booking__getPage, chunkSize=chunkSize)
+
+  def booking__iterByUserId(self, userId: str, chunkSize: int = 500):
+    """
+    Async generator that yields the user's bookings and their data, ordered by
+    date time, loading `chunkSize` bookings at a time.
+    """
+
+    return _iterPages(
+      self.booking__getPageByUserId, userId, chunkSize=chunkSize
+    )
+
+  def booking__iterSummaries(self, chunkSize: int = 500):
+    """
+    Async generator that yields a summary of every booking, ordered by date 
+    time, loading `chunkSize` bookings at a time.
+    """
+
+    return _iterPages(self.booking__getSummariesPage, chunkSize=chunkSize)
+
+  def booking__iterSummariesByUserId(self, userId: str, chunkSize: int = 500):
+    """
+    Async generator that yields a summary of the user's bookings, ordered by 
+    date time, loading `chunkSize` bookings at a time.
+    """
+
+    return _iterPages(
+      self.booking__getSummariesPageByUserId, userId, chunkSize=chunkSize
+    )
+
+  #endregion
+
+
+  #region Film
+
+  film__allTitles = _delegate("film__allTitles")
+  film__idByTitle = _delegate("film__idByTitle")
+
+  #endregion
+
+
+  #region Showing
+
+  showing__create = _delegate("showing__create", write=True)
+  showing__getByFilm = _delegate("showing__getByFilm")
+  showing__getSeatMap = _delegate("showing__getSeatMap")
+  showing__holdSeats = _delegate("showing__holdSeats", write=True)
+  showing__releaseSeats = _delegate("showing__releaseSeats", write=True)
+
+  #endregion
+
+
+  #region TicketHolderType
+
+  ticketHolderType__allTypes = _delegate("ticketHolderType__allTypes")
+
+  #endregion
+
+
+  #region Report
+
+  report__sales = _delegate("report__sales")
+
+  #endregion
@@ -0,0 +1,199 @@
+import collections as _COLLECTIONS
+import threading as _THREADING
+import time as _TIME
+import typing as _TYPING
+
+
+
+"""
+This script defines the in-memory caches in front of the database.
+
+Reference data lives in tables that are tiny and almost never change, like 
+`Film`, `TicketHolderType` and `PermissionGroup`, so there is no point asking 
+SQLite for them on every booking.
+
+Users' data (identity and permission groups) is looked up on every request, 
+so the most recently used users are cached for a short time.
+
+The queries that write to these tables invalidate the caches, so they should 
+never serve stale data as long as writes go through the `queries` module.
+"""
+
+
+
+class ReferenceCache:
+  """Thread safe cache of values loaded from reference tables"""
+
+  def __init__(self):
+    self._lock = _THREADING.Lock()
+
+    self._entries: dict[str, dict[_TYPING.Hashable, _TYPING.Any]] = {}
+    """Cached values, grouped by the name of the table they were loaded from"""
+
+    self._generations: dict[str, int] = {}
+    """
+    Incremented every time a table is invalidated so a value loaded before an 
+    invalidation is never stored after it
+    """
+
+    self.hits = 0
+    self.misses = 0
+
+
+  def get(self, table: str, key: _TYPING.Hashable, loader: _TYPING.Callable):
+    """
+    Return the cached value for `key` in `table`, calling `loader` to get and 
+    store the value if it isn't cached yet.
+    """
+
+    with self._lock:
+      entries = self._entries.get(table)
+      if entries is not None and key in entries:
+        self.hits += 1
+        return entries[key]
+
+      self.misses += 1
+      generation = self._generations.get(table, 0)
+
+    value = loader()
+
+    with self._lock:
+      if self._generations.get(table, 0) == generation:
+        self._entries.setdefault(table, {})[key] = value
+
+    return value
+
+
+  def invalidate(self, *tables: str):
+    """
+    Drop the cached values for the given tables, or for every table if none 
+    are given.
+    """
+
+    with self._lock:
+      for table in (tables or list(self._entries.keys())):
+        self._entries.pop(table, None)
+        self._generations[table] = self._generations.get(table, 0) + 1
+
+
+  def stats(self):
+    """Get the hit / miss counters of the cache"""
+
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "hitRate": (self.hits / lookups) if lookups > 0 else 0.0,
+        "tables": sorted(self._entries.keys()),
+      }
+
+
+
+refCache = ReferenceCache()
+"""The instance of the reference data cache shared by the whole process"""
+
+
+
+class UserCache:
+  """
+  Thread safe cache of users' data keyed by user id, that holds at most 
+  `maxSize` users (dropping the least recently used) for at most `ttl` seconds
+  """
+
+  def __init__(self, maxSize: int = 1024, ttl: float = 60):
+    self.maxSize = maxSize
+    """Most users cached at once, `0` turns the cache off"""
+
+    self.ttl = ttl
+    """
+    Seconds a user is cached for, this bounds how stale the data can be if it 
+    is changed outside of the `queries` module
+    """
+
+    self._lock = _THREADING.Lock()
+
+    self._entries: _COLLECTIONS.OrderedDict = _COLLECTIONS.OrderedDict()
+    """`(expiresAt, value)` of each user, least recently used first"""
+
+    self._generation = 0
+    """
+    Incremented on every invalidation so a value loaded before an 
+    invalidation is never stored after it
+    """
+
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+
+  def get(self, key: _TYPING.Hashable, loader: _TYPING.Callable):
+    """
+    Return the cached value for `key`, calling `loader` to get and store the 
+    value if it isn't cached (or has expired).
+    """
+
+    now = _TIME.monotonic()
+
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        expiresAt, value = entry
+        if expiresAt > now:
+          self.hits += 1
+          self._entries.move_to_end(key)
+          return value
+
+        self.expirations += 1
+        del self._entries[key]
+
+      self.misses += 1
+      generation = self._generation
+
+    value = loader()
+
+    with self._lock:
+      if self._generation == generation and self.maxSize > 0:
+        self._entries[key] = (_TIME.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxSize:
+          self._entries.popitem(last=False)
+          self.evictions += 1
+
+    return value
+
+
+  def invalidate(self, *keys: _TYPING.Hashable):
+    """Drop the cached values for the given keys, or every value if none are given"""
+
+    with self._lock:
+      self._generation += 1
+
+      if len(keys) == 0:
+        self._entries.clear()
+      for key in keys:
+        self._entries.pop(key, None)
+
+
+  def stats(self):
+    """Get the size and the hit / miss counters of the cache"""
+
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "size": len(self._entries),
+        "maxSize": self.maxSize,
+        "ttl": self.ttl,
+        "hits": self.hits,
+        "misses": self.misses,
+        "hitRate": (self.hits / lookups) if lookups > 0 else 0.0,
+        "evictions": self.evictions,
+        "expirations": self.expirations,
+      }
+
+
+
+userCache = UserCache()
+"""The instance of the user data cache shared by the whole process"""
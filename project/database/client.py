@@ -1,34 +1,578 @@
+import atexit as _ATEXIT
+import contextlib as _CONTEXTLIB
+import functools as _FUNCTOOLS
+import glob as _GLOB
+import heapq as _HEAPQ
 import os as _OS
+import pathlib as _PATHLIB
 import peewee as _PW
+import playhouse.pool as _POOL
+import random as _RANDOM
+import sqlite3 as _SQLITE3
+import sys as _SYS
+import threading as _THREADING
+import time as _TIME
+import typing as _TYPING
 
-from .schema.utils import Utils as _SchemaUtils
+from .config import Config as _Config
+from .schema import Schema as _Schema
+from .tracing import Tracer as _Tracer
 
 
 
 """
 This script provides utilities for creating the database and database client.
+
+Nothing touches the database file until the first query, so importing the 
+database module is cheap for short-lived processes.
 """
 
 
 
+class _ClientDatabaseMixin:
+  """
+  Behaviour shared by the client's database classes:
+    - runs a setup callback the first time any thread opens a connection, 
+      instead of when the database is created
+    - traces executed statements when tracing is enabled
+  """
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+
+    self.onFirstConnect: _TYPING.Callable[[], None] | None = None
+    """Called once, on the first connection, then cleared"""
+
+    self.tracer: _Tracer | None = None
+    """Records every executed statement when tracing is enabled"""
+
+    self.snapshotPath: str | None = None
+    """The snapshot this database reads, if it's a reporting snapshot"""
+
+
+  def _initialize_connection(self, conn):
+    super()._initialize_connection(conn)
+
+    # `peewee` holds `self._lock` while connecting, so only one thread can get 
+    # here at a time
+    callback, self.onFirstConnect = self.onFirstConnect, None
+    if callback is None: return
+
+    try:
+      callback()
+    except:
+      self.onFirstConnect = callback  # try again on the next connection
+      raise
+
+
+  def execute_sql(self, sql, params=None, *args, **kwargs):
+    tracer = self.tracer
+    if tracer is None:
+      return super().execute_sql(sql, params, *args, **kwargs)
+
+    start = _TIME.perf_counter()
+    try:
+      return super().execute_sql(sql, params, *args, **kwargs)
+    finally:
+      tracer.record(sql, _TIME.perf_counter() - start)
+
+
+
+class ClientDatabase(_ClientDatabaseMixin, _PW.SqliteDatabase):
+  """
+  Database with one connection per thread, each kept open for as long as the 
+  thread lives (the `peewee` default)
+  """
+
+
+
+class PooledClientDatabase(_ClientDatabaseMixin, _POOL.PooledSqliteDatabase):
+  """
+  Database with a bounded pool of connections that threads check out for the 
+  length of a `DBClient.connection()` scope.
+
+  `stale_timeout` is the idle timeout: connections are stamped with when they 
+  were returned to the pool, and closed if they sat there too long.
+  """
+
+  def _is_closed(self, conn):
+    # Health check, run before a pooled connection is handed out
+    try:
+      conn.execute("SELECT 1").fetchone()
+    except Exception:
+      return True
+    return False
+
+
+  def _close(self, conn, close_conn=False):
+    with self._pool_lock:
+      key = self.conn_key(conn)
+      if close_conn or key not in self._in_use:
+        return super()._close(conn, close_conn)
+
+      # Return the connection to the pool, stamped with when it was last used
+      self._in_use.pop(key)
+      _HEAPQ.heappush(self._connections, (_TIME.time(), _POOL._sentinel(), conn))
+
+
+
 class DBClient:
   """Class for interacting with the database"""
 
   @staticmethod
-  def createDatabase():
+  def createDatabase(config: _Config):
     """Create/Get the database"""
 
-    dbPath = _OS.path.join(_OS.path.dirname(__file__), "./data.db")
-    return _PW.SqliteDatabase(dbPath, pragmas={ "foreign_keys": 1 })
+    if config.poolSize > 0:
+      return PooledClientDatabase(config.path,
+        pragmas=config.pragmas,
+        max_connections=config.poolSize,
+        stale_timeout=config.poolIdleTimeout,
+        timeout=config.poolWaitTimeout,
+        # Connections move between threads, but only one uses each at a time
+        check_same_thread=False,
+      )
+
+    return ClientDatabase(config.path, pragmas=config.pragmas)
+
+
+  def __init__(self, config: _Config | None = None):
+    """
+    Initialise a client for the database
+
+    Uses the configuration from the environment variables if `config` isn't 
+    given.
+    """
+
+    self.config = config or _Config.fromEnv()
+
+    self.database = __class__.createDatabase(self.config)
+    self.database.onFirstConnect = self.setupSchema
+
+    self.pooled = isinstance(self.database, PooledClientDatabase)
+    """Whether connections are checked out of a pool for each scope"""
+
+    self._local = _THREADING.local()
+    """
+    How deep in `connection()` scopes each thread is, and the callbacks 
+    waiting for it's transaction to end
+    """
+
+    self.busyRetries = 0
+    """Number of times `retryOnBusy` has retried because SQLite was busy"""
+
+    self.reportingDatabase: ClientDatabase | None = None
+    """
+    Database reports read from, created by the first report unless reporting 
+    is `"off"`. In `"snapshot"` mode it's replaced by every new snapshot
+    """
+
+    self._reportingLock = _THREADING.Lock()
+    self._snapshotAt: float | None = None
+    """When the current snapshot was copied (`time.monotonic()`)"""
+    self._snapshotCount = 0
+    self._snapshotThread: _THREADING.Thread | None = None
+    """Thread copying a new snapshot, if one is being copied"""
+
+    self._snapshotReaders: dict[str, int] = {}
+    """Number of reports reading each snapshot, which mustn't be deleted"""
+
+    _Schema.Utils.initializeProxy(self.database)
+    self.Tables = _Schema.Models
+
+    if self.config.trace:
+      self.enableTracing(reportAtExit=True)
+
+
+  @property
+  def tracer(self) -> _Tracer | None:
+    """The tracer recording statements, `None` unless tracing is enabled"""
+
+    return self.database.tracer
+
+
+  def enableTracing(self, repeatThreshold: int = 3, reportAtExit: bool = False):
+    """
+    Start recording every statement, grouped by the `Database` / `Queries` 
+    method that executed it.
+
+    Returns the tracer.
+    """
+
+    tracer = _Tracer(repeatThreshold=repeatThreshold)
+    self.database.tracer = tracer
+    if self.reportingDatabase is not None:
+      self.reportingDatabase.tracer = tracer
+
+    if reportAtExit:
+      _ATEXIT.register(lambda: print(tracer.report(), file=_SYS.stderr))
+
+    return tracer
+
+
+  def disableTracing(self):
+    """Stop recording statements"""
+
+    self.database.tracer = None
+    if self.reportingDatabase is not None:
+      self.reportingDatabase.tracer = None
+
+
+  @_CONTEXTLIB.contextmanager
+  def connection(self):
+    """
+    Scope this thread's use of a connection, can be used as a decorator.
+
+    With a connection pool, the outermost scope checks a connection out and 
+    returns it when it ends. Otherwise every thread keeps it's own connection 
+    open and this does nothing.
+    """
+
+    if not self.pooled:
+      yield self.database
+      return
+
+    depth = getattr(self._local, "depth", 0)
+    opened = self.database.connect(reuse_if_open=True)
+    self._local.depth = depth + 1
+
+    try:
+      yield self.database
+    finally:
+      self._local.depth = depth
+      if opened: self.database.close()
+
+
+  @_CONTEXTLIB.contextmanager
+  def transaction(self, write: bool = False):
+    """
+    Scope a connection and a transaction (or a savepoint if one is already 
+    open), can be used as a decorator.
+
+    Write transactions start with `BEGIN IMMEDIATE`, so they take SQLite's 
+    write lock up front and wait for other writers, instead of failing when 
+    they try to upgrade a read lock.
+    """
+
+    with self.connection():
+      outermost = not self.database.in_transaction()
+      if outermost: self._local.afterTransaction = []
+
+      try:
+        with self.database.atomic("IMMEDIATE" if write else None):
+          yield self.database
+      finally:
+        if outermost:
+          callbacks, self._local.afterTransaction = self._local.afterTransaction, None
+          for callback in callbacks: callback()
+
+
+  def afterTransaction(self, callback: _TYPING.Callable[[], None]):
+    """
+    Call `callback` once this thread's outermost `transaction()` scope has 
+    ended (committed or rolled back), or straight away outside of one.
+
+    Caches are invalidated this way: invalidating while the transaction is 
+    still open lets another connection load the old rows and cache them again 
+    before the commit.
+    """
+
+    pending = getattr(self._local, "afterTransaction", None)
+    if pending is None:
+      callback()
+    else:
+      pending.append(callback)
+
+
+  @_CONTEXTLIB.contextmanager
+  def reporting(self):
+    """
+    Scope a read transaction for a report, can be used as a decorator.
+
+    Yields the database the report should read from, which depends on 
+    `config.reporting`. The models are bound to the main database, so execute 
+    queries on it explicitly, with `query.execute(database)` or 
+    `database.execute(query)`.
+
+    In `"snapshot"` mode the first report copies the whole database before it 
+    can start. After that, a report that finds the snapshot older than 
+    `config.snapshotInterval` starts copying a new one on a background thread, 
+    and reads the current one until the copy is done.
+    """
+
+    if self.config.reporting == "off":
+      with self.transaction() as database:
+        yield database
+      return
+
+    database = self._reportingConnection()
+    try:
+      with database.atomic():
+        yield database
+    finally:
+      self._releaseSnapshot(database.snapshotPath)
+
+
+  def _reportingConnection(self) -> ClientDatabase:
+    """
+    Open this thread's reporting connection, copying a new snapshot first if 
+    the current one is too old.
+
+    It's snapshot (if it reads one) counts as being read until 
+    `_releaseSnapshot`, so it isn't deleted.
+    """
+
+    current: ClientDatabase | None = getattr(self._local, "reportingDatabase", None)
+
+    # A report inside another report keeps reading the same snapshot
+    if current is not None and current.in_transaction():
+      with self._reportingLock:
+        self._readSnapshot(current.snapshotPath)
+      return current
+
+    with self._reportingLock:
+      if self.config.reporting == "snapshot":
+        if self.reportingDatabase is None:
+          # There is nothing to read until the first snapshot is copied
+          self.reportingDatabase = self.createReportingDatabase(
+            self.copySnapshot()
+          )
+          self._snapshotAt = _TIME.monotonic()
+
+        elif (
+          self._snapshotThread is None and
+          _TIME.monotonic() - self._snapshotAt >= self.config.snapshotInterval
+        ):
+          # Keep reading the current snapshot while a new one is copied
+          self._snapshotThread = _THREADING.Thread(
+            target=self._refreshSnapshot, name="db-snapshot"
+          )
+          self._snapshotThread.start()
+
+      elif self.reportingDatabase is None:
+        # Opening the database creates the file and schema, which a read-only 
+        # connection can't do
+        with self.connection():
+          self.database.connection()
+
+        self.reportingDatabase = self.createReportingDatabase(self.config.path)
+
+      database = self.reportingDatabase
+      self._readSnapshot(database.snapshotPath)
+
+    if current is not database:
+      if current is not None: current.close()
+      self._local.reportingDatabase = database
+
+    database.connect(reuse_if_open=True)
+    return database
+
+
+  def _readSnapshot(self, path: str | None):
+    """
+    Count a report reading a snapshot, so it isn't deleted. Call it with 
+    `_reportingLock` held
+    """
+
+    if path is None: return
+
+    self._snapshotReaders[path] = self._snapshotReaders.get(path, 0) + 1
+
+
+  def _releaseSnapshot(self, path: str | None):
+    """
+    Count a report that's done reading a snapshot, and delete the snapshot if 
+    it was the last report reading it and a newer one has been copied
+    """
+
+    if path is None: return
+
+    with self._reportingLock:
+      self._snapshotReaders[path] -= 1
+      if self._snapshotReaders[path] > 0: return
+
+      del self._snapshotReaders[path]
+      if path == self.reportingDatabase.snapshotPath: return
+
+    try:
+      _OS.remove(path)
+    except OSError:  # still open (Windows), deleted by the next refresh
+      pass
+
+
+  @_CONTEXTLIB.contextmanager
+  def keepSnapshot(self, path: str | None):
+    """
+    Scope that stops a snapshot (`database.snapshotPath` of a `reporting()` 
+    database) being deleted, e.g. while other processes read it with 
+    `readSnapshot`. Does nothing if `path` is `None`.
+    """
+
+    with self._reportingLock:
+      self._readSnapshot(path)
+
+    try:
+      yield path
+    finally:
+      self._releaseSnapshot(path)
+
+
+  def readSnapshot(self, path: str):
+    """
+    Read reports from an existing snapshot (e.g. another process'), instead of 
+    copying new ones
+    """
+
+    with self._reportingLock:
+      self.config.reporting = "snapshot"
+      self.config.snapshotInterval = float("inf")
+      self.reportingDatabase = self.createReportingDatabase(path)
+      self._snapshotAt = _TIME.monotonic()
+
+
+  def _refreshSnapshot(self):
+    """
+    Copy a new snapshot in the background, switch reports to it, then delete 
+    the older snapshots no report is reading
+    """
+
+    try:
+      database = self.createReportingDatabase(self.copySnapshot())
+
+      with self._reportingLock:
+        self.reportingDatabase = database
+        self._snapshotAt = _TIME.monotonic()
+        keep = [ database.snapshotPath, *self._snapshotReaders ]
+
+      self.removeSnapshots(keep=keep)
+
+    finally:
+      with self._reportingLock:
+        self._snapshotThread = None
+
+      # Don't keep a connection open for a thread that's finished
+      if not self.pooled: self.database.close()
+
+
+  def createReportingDatabase(self, path: str) -> ClientDatabase:
+    """
+    Create a database that opens read-only connections to `path`, with the 
+    `reporting` profile's pragmas
+    """
+
+    uri = _PATHLIB.Path(path).absolute().as_uri() + "?mode=ro"
+    if self.config.reporting == "snapshot":
+      # Nothing writes to a snapshot, so SQLite can skip locking it
+      uri += "&immutable=1"
+
+    database = ClientDatabase(uri, uri=True, pragmas=_Config.PROFILES["reporting"])
+    database.tracer = self.database.tracer
+    if self.config.reporting == "snapshot":
+      database.snapshotPath = path
+    return database
+
+
+  def copySnapshot(self) -> str:
+    """
+    Copy the database to a new snapshot file with SQLite's online backup API.
+
+    Returns the path of the snapshot.
+    """
+
+    if self._snapshotCount == 0:
+      _ATEXIT.register(self.removeSnapshots)
+
+    self._snapshotCount += 1
+    path = f"{self.config.path}.snapshot-{_OS.getpid()}-{self._snapshotCount}"
+
+    target = _SQLITE3.connect(path)
+    try:
+      with self.connection():
+        self.database.connection().backup(target)
+
+      # Immutable databases can't have a write-ahead log
+      target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+      target.close()
+
+    return path
+
+
+  def removeSnapshots(self, keep: _TYPING.Collection[str] = ()):
+    """Delete this process' snapshots, except the ones in `keep`"""
+
+    if len(keep) == 0 and self.reportingDatabase is not None:
+      self.reportingDatabase.close()
+
+    pattern = f"{_GLOB.escape(self.config.path)}.snapshot-{_OS.getpid()}-*"
+    for path in _GLOB.glob(pattern):
+      if path in keep: continue
+      try:
+        _OS.remove(path)
+      except OSError:  # still open (Windows), try again next time
+        pass
+
+
+  @staticmethod
+  def isBusyError(error: Exception) -> bool:
+    """Whether an error is SQLite failing to get a lock (`SQLITE_BUSY`)"""
+
+    return (
+      isinstance(error, _PW.OperationalError) and
+      ("locked" in str(error) or "busy" in str(error))
+    )
+
+
+  def retryOnBusy(
+    self, timeout: float = 10, backoff: float = 0.01, maxBackoff: float = 0.5
+  ):
+    """
+    Decorator that calls the function again when SQLite is too busy to give it 
+    a lock, until `timeout` seconds have passed since the first call. The wait 
+    before each retry doubles, from `backoff` up to `maxBackoff` seconds, with 
+    random jitter so retrying writers don't collide again.
+
+    The function should scope it's own transaction, so every attempt starts a 
+    new one. Inside another transaction the error is raised straight away, 
+    because only the outermost transaction can be retried.
+    """
+
+    def decorator(function):
+      @_FUNCTOOLS.wraps(function)
+      def wrapper(*args, **kwargs):
+        deadline = _TIME.monotonic() + timeout
+        delay = backoff
+
+        while True:
+          try:
+            return function(*args, **kwargs)
+
+          except _PW.OperationalError as error:
+            left = deadline - _TIME.monotonic()
+            if (
+              not __class__.isBusyError(error) or
+              left <= 0 or
+              self.database.in_transaction()
+            ): raise
+
+            self.busyRetries += 1
+            _TIME.sleep(min(left, delay * _RANDOM.uniform(0.5, 1.5)))
+            delay = min(delay * 2, maxBackoff)
+
+      return wrapper
+    return decorator
 
 
-  def __init__(self):
-    """Initialise a client for the database"""
+  def setupSchema(self):
+    """
+    Create the tables and indexes, unless the database already has the current 
+    schema version.
+    """
 
-    self.database = __class__.createDatabase()
-    self.database.connect()
+    # Read-only connections can't create anything
+    if self.config.pragmas.get("query_only"): return
 
-    self.Tables = _SchemaUtils.createTables(self.database)
+    _Schema.Utils.ensureSchema(self.database)
 
 
 
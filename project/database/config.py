@@ -0,0 +1,186 @@
+import os as _OS
+import typing as _TYPING
+
+
+
+"""
+This script defines the configuration for the database client.
+
+The configuration is read from environment variables so it can be changed 
+without touching the code:
+  - `DTS_DB_PATH`: path of the SQLite database file
+  - `DTS_DB_PROFILE`: name of the pragma profile, one of `Config.PROFILES`
+  - `DTS_DB_PRAGMAS`: extra pragmas that override the profile, e.g. 
+    `"cache_size=-131072,mmap_size=0"`
+  - `DTS_DB_TRACE`: set to `1` to trace every SQL statement and print a 
+    summary when the process exits
+  - `DTS_DB_POOL_SIZE`: use a pool of at most this many connections instead 
+    of one connection per thread
+  - `DTS_DB_POOL_IDLE_TIMEOUT`: seconds a pooled connection can sit unused 
+    before it is closed
+  - `DTS_DB_POOL_WAIT_TIMEOUT`: seconds to wait for a free pooled connection
+  - `DTS_DB_REPORTING`: where admin listings read from, one of 
+    `Config.REPORTING_MODES`
+  - `DTS_DB_SNAPSHOT_INTERVAL`: seconds a reporting snapshot is used for 
+    before a new one is copied (in the background)
+  - `DTS_DB_REPORT_WORKERS`: number of processes reports are split across
+"""
+
+
+
+Pragmas = dict[str, _TYPING.Any]
+
+
+
+class Config:
+  """Settings used to create the database"""
+
+  DEFAULT_PATH = _OS.path.join(_OS.path.dirname(__file__), "./data.db")
+
+  PROFILES: dict[str, Pragmas] = {
+    # SQLite's own defaults: rollback journal, full sync
+    "default": {
+      "foreign_keys": 1,
+    },
+
+    # Write-ahead log, but still sync on every commit
+    "durable": {
+      "foreign_keys": 1,
+      "journal_mode": "wal",
+      "synchronous": "full",
+      "busy_timeout": 5000,
+    },
+
+    # Write-ahead log that only syncs at checkpoints, with bigger caches. A 
+    # power loss can lose the last few commits, but never corrupts the database
+    "throughput": {
+      "foreign_keys": 1,
+      "journal_mode": "wal",
+      "synchronous": "normal",
+      "cache_size": -64 * 1024,  # 64MB
+      "mmap_size": 256 * 1024 * 1024,
+      "temp_store": "memory",
+      "busy_timeout": 5000,
+    },
+
+    # Read-only connections for reports, writes raise an error
+    "reporting": {
+      "foreign_keys": 1,
+      "query_only": 1,
+      "cache_size": -256 * 1024,  # 256MB
+      "mmap_size": 1024 * 1024 * 1024,
+      "temp_store": "memory",
+      "busy_timeout": 5000,
+    },
+  }
+  """Named sets of pragmas to open the database with"""
+
+  REPORTING_MODES = {
+    "off": "on the same connections as everything else",
+    "readonly": "on separate read-only connections to the database",
+    "snapshot": "on a copy of the database, made with SQLite's backup API",
+  }
+  """Where admin listings and other reports read from"""
+
+
+  def __init__(
+    self,
+    path: str | None = None,
+    profile: str = "default",
+    pragmas: Pragmas | None = None,
+    trace: bool = False,
+    poolSize: int = 0,
+    poolIdleTimeout: float = 300,
+    poolWaitTimeout: float = 10,
+    reporting: str = "off",
+    snapshotInterval: float = 60,
+    reportWorkers: int = 1,
+  ):
+    if profile not in __class__.PROFILES:
+      raise ValueError(
+        f"Unknown database profile \"{profile}\", "
+        f"expected one of {list(__class__.PROFILES.keys())}"
+      )
+
+    if reporting not in __class__.REPORTING_MODES:
+      raise ValueError(
+        f"Unknown reporting mode \"{reporting}\", "
+        f"expected one of {list(__class__.REPORTING_MODES.keys())}"
+      )
+
+    self.path = path or __class__.DEFAULT_PATH
+    """Path of the SQLite database file"""
+
+    self.profile = profile
+    """Name of the pragma profile"""
+
+    self.pragmas: Pragmas = { **__class__.PROFILES[profile], **(pragmas or {}) }
+    """Pragmas set on every connection"""
+
+    self.trace = trace
+    """Whether to trace every SQL statement, see `tracing.py`"""
+
+    self.poolSize = poolSize
+    """
+    Most connections in the connection pool, `0` to use one connection per 
+    thread instead of a pool
+    """
+
+    self.poolIdleTimeout = poolIdleTimeout
+    """Seconds a pooled connection can sit unused before it is closed"""
+
+    self.poolWaitTimeout = poolWaitTimeout
+    """Seconds to wait for a free pooled connection before giving up"""
+
+    self.reporting = reporting
+    """
+    Where reports read from, see `REPORTING_MODES`. Separate connections 
+    don't delay writers while they read, as long as the database is in WAL 
+    mode (`durable` / `throughput` profiles), snapshots never delay them 
+    except while they are copied.
+    """
+
+    self.snapshotInterval = snapshotInterval
+    """
+    Seconds a reporting snapshot is used for before a new one is copied, in 
+    the background
+    """
+
+    self.reportWorkers = reportWorkers
+    """
+    Number of processes reports are split across, `1` to run them in this 
+    process
+    """
+
+
+  @staticmethod
+  def parsePragmas(text: str) -> Pragmas:
+    """Parse pragmas written like `"cache_size=-2000,temp_store=memory"`"""
+
+    pragmas: Pragmas = {}
+
+    for item in text.split(","):
+      if not item.strip(): continue
+
+      key, _, value = item.partition("=")
+      pragmas[key.strip()] = value.strip()
+
+    return pragmas
+
+
+  @staticmethod
+  def fromEnv():
+    """Create the configuration from the `DTS_DB_*` environment variables"""
+
+    return Config(
+      path=_OS.environ.get("DTS_DB_PATH") or None,
+      profile=_OS.environ.get("DTS_DB_PROFILE") or "default",
+      pragmas=Config.parsePragmas(_OS.environ.get("DTS_DB_PRAGMAS", "")),
+      trace=_OS.environ.get("DTS_DB_TRACE", "") not in ("", "0"),
+      poolSize=int(_OS.environ.get("DTS_DB_POOL_SIZE") or 0),
+      poolIdleTimeout=float(_OS.environ.get("DTS_DB_POOL_IDLE_TIMEOUT") or 300),
+      poolWaitTimeout=float(_OS.environ.get("DTS_DB_POOL_WAIT_TIMEOUT") or 10),
+      reporting=_OS.environ.get("DTS_DB_REPORTING") or "off",
+      snapshotInterval=float(_OS.environ.get("DTS_DB_SNAPSHOT_INTERVAL") or 60),
+      reportWorkers=int(_OS.environ.get("DTS_DB_REPORT_WORKERS") or 1),
+    )
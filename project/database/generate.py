@@ -0,0 +1,289 @@
+import argparse as _ARGPARSE
+import bisect as _BISECT
+import itertools as _ITERTOOLS
+import random as _RANDOM
+import time as _TIME
+from datetime import datetime as _DT, timedelta as _TD
+
+import peewee as _PW
+
+from .cache import refCache
+from .client import dbClient
+from .queries import Queries as _dbQueries
+from .schema import Schema as _Schema
+from .schema.enums import ENUMs as _ENUMs
+from .seed import FILM_TITLES, seed
+
+
+
+"""
+This script generates a large, synthetic dataset so production-scale behaviour
+can be reproduced locally.
+
+The seed data is inserted first, then users, extra films, bookings and tickets
+are generated from a random seed, so the same arguments always generate the
+same data.
+
+Point `DTS_DB_PATH` at a new file to keep the generated data away from
+`data.db`, e.g:
+```
+DTS_DB_PATH=big.db DTS_DB_PROFILE=throughput uv run -m project.database.generate --users 200000
+```
+"""
+
+
+
+class Generator:
+  """Generates and bulk inserts a synthetic dataset"""
+
+  USERNAME_PREFIX = "generated-user-"
+
+  def __init__(
+    self,
+    users: int = 10_000,
+    films: int = 50,
+    bookingsPerUser: float = 5,
+    ticketsPerBooking: float = 2.5,
+    days: int = 365,
+    start: _DT = _DT(2025, 1, 1),
+    skew: float = 1.0,
+    seed: int = 0,
+    usersPerTransaction: int = 10_000,
+  ):
+    self.users = users
+    """Number of users to generate"""
+
+    self.films = max(films, len(FILM_TITLES))
+    """Total number of films, including the seeded ones"""
+
+    self.bookingsPerUser = bookingsPerUser
+    """Average number of bookings each user makes"""
+
+    self.ticketsPerBooking = ticketsPerBooking
+    """Average number of tickets in each booking (at least 1)"""
+
+    self.days = days
+    """Number of days the bookings are spread across"""
+
+    self.start = start
+    """Date of the first day bookings are made for"""
+
+    self.skew = skew
+    """
+    Zipf exponent of film popularity: `0` means every film is as popular,
+    higher means bookings are more concentrated on the first few films
+    """
+
+    self.usersPerTransaction = usersPerTransaction
+    """Number of users (and their bookings) written in each transaction"""
+
+    self.random = _RANDOM.Random(seed)
+
+
+  UUID_VERSION_MASK = ~(0xF000 << 64 | 0xC000 << 48)
+  UUID_VERSION_BITS = 0x4000 << 64 | 0x8000 << 48
+
+  def uuid(self) -> str:
+    """
+    Get a random version 4 UUID (as it's stored in the database) from the 
+    seed, without the overhead of creating `uuid.UUID` objects.
+    """
+
+    bits = self.random.getrandbits(128)
+    bits = bits & __class__.UUID_VERSION_MASK | __class__.UUID_VERSION_BITS
+    return f"{bits:032x}"
+
+
+  def filmTitles(self) -> list[str]:
+    """The seeded films, then generated ones, most popular first"""
+
+    generated = [
+      f"Generated Film {i:05d}"
+      for i in range(self.films - len(FILM_TITLES))
+    ]
+    return FILM_TITLES + generated
+
+
+  @staticmethod
+  def insert(model: type[_PW.Model], fields: list[_PW.Field], rows: list[tuple]):
+    """
+    Insert rows of values (in the same order as `fields`) in bulk.
+
+    `peewee` spends most of it's time building SQL for big `insert_many`s, so 
+    the single row `INSERT` is built once and run with `executemany`. The 
+    values must already be in the form they are stored in.
+    """
+
+    sql, _ = model.insert({ field: None for field in fields }).sql()
+    dbClient.database.cursor().executemany(sql, rows)
+
+
+  def batches(self, titles: list[str]):
+    """
+    Generator that yields `(users, bookings, tickets)` rows for 
+    `usersPerTransaction` users at a time.
+    """
+
+    rng = self.random
+
+    # Zipf weights, as cumulative weights so picking a film is a bisect
+    weights = [1 / (rank + 1) ** self.skew for rank in range(len(titles))]
+    cumWeights = list(_ITERTOOLS.accumulate(weights))
+    totalWeight = cumWeights[-1]
+
+    # Every possible showing time, so picking one is a single random number
+    showingTimes = [
+      str(self.start + _TD(days=day, hours=hour, minutes=minute))
+      for day in range(self.days)
+      for hour in range(10, 23)
+      for minute in (0, 15, 30, 45)
+    ]
+
+    ticketTypes = [type.value for type in _ENUMs.TicketHolderType_ENUM]
+    price = _dbQueries.Tables.Ticket.PRICE_GBP
+    maxBookings = round(self.bookingsPerUser * 2)
+    maxTickets = max(1, round(self.ticketsPerBooking * 2 - 1))
+
+    random = rng.random
+    uuid = self.uuid
+    bisect = _BISECT.bisect
+
+    for firstUser in range(0, self.users, self.usersPerTransaction):
+      lastUser = min(firstUser + self.usersPerTransaction, self.users)
+
+      users = []
+      bookings = []
+      tickets = []
+
+      for i in range(firstUser, lastUser):
+        userId = uuid()
+        users.append((userId, f"{__class__.USERNAME_PREFIX}{i}", "password"))
+
+        for _ in range(int(random() * (maxBookings + 1))):
+          bookingId = uuid()
+
+          film = titles[bisect(cumWeights, random() * totalWeight)]
+          datetime = showingTimes[int(random() * len(showingTimes))]
+          bookings.append((bookingId, userId, film, datetime))
+
+          for _ in range(1 + int(random() * maxTickets)):
+            ticketType = ticketTypes[int(random() * len(ticketTypes))]
+            tickets.append((uuid(), bookingId, ticketType, price))
+
+      yield users, bookings, tickets
+
+
+  def run(self):
+    """
+    Generate and insert the dataset.
+
+    Returns the number of rows inserted into each table.
+    """
+
+    Tables = dbClient.Tables
+    User = Tables.User
+    Booking = Tables.Booking
+    Ticket = Tables.Ticket
+
+    seed()
+
+    if (User
+      .select()
+      .where(User.username.startswith(__class__.USERNAME_PREFIX))
+      .exists()
+    ):
+      raise Exception("Data has already been generated in this database")
+
+    # === Films ===
+
+    titles = self.filmTitles()
+    for chunk in _PW.chunked(titles, 1000):
+      (Tables.Film
+        .insert_many([(title,) for title in chunk], fields=[Tables.Film.title])
+        .on_conflict_ignore()
+        .execute()
+      )
+    refCache.invalidate("Film")
+
+    # === ===
+
+
+    # === Users, bookings and tickets ===
+
+    # Building the secondary indexes once at the end is much faster than 
+    # updating them for every row. The schema version is cleared until they 
+    # are rebuilt, so if this process is killed first, the next one to connect 
+    # creates them
+    version = dbClient.database.pragma("user_version")
+    dbClient.database.pragma("user_version", 0)
+    Booking._schema.drop_indexes(safe=True)
+    Ticket._schema.drop_indexes(safe=True)
+
+    counts = { "User": 0, "Film": len(titles), "Booking": 0, "Ticket": 0 }
+
+    try:
+      for users, bookings, tickets in self.batches(titles):
+        with dbClient.database.atomic():
+          __class__.insert(User,
+            [User.id, User.username, User.password], users)
+          __class__.insert(Booking,
+            [Booking.id, Booking.user, Booking.film, Booking.datetime], bookings)
+          __class__.insert(Ticket,
+            [Ticket.id, Ticket.booking, Ticket.holderType, Ticket.paidPriceGBP],
+            tickets)
+
+        counts["User"] += len(users)
+        counts["Booking"] += len(bookings)
+        counts["Ticket"] += len(tickets)
+
+    finally:
+      _Schema.Utils.createMissingIndexes(dbClient.database)
+      dbClient.database.pragma("user_version", version)
+
+    # === ===
+
+    return counts
+
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(
+    description="Generate a large synthetic dataset in the configured database"
+  )
+  parser.add_argument("--users", type=int, default=10_000)
+  parser.add_argument("--films", type=int, default=50)
+  parser.add_argument("--bookings-per-user", type=float, default=5)
+  parser.add_argument("--tickets-per-booking", type=float, default=2.5)
+  parser.add_argument("--days", type=int, default=365,
+    help="number of days bookings are spread across")
+  parser.add_argument("--start", type=_DT.fromisoformat, default=_DT(2025, 1, 1),
+    help="date of the first day bookings are made for")
+  parser.add_argument("--skew", type=float, default=1.0,
+    help="Zipf exponent of film popularity, 0 for uniform")
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  generator = Generator(
+    users=args.users,
+    films=args.films,
+    bookingsPerUser=args.bookings_per_user,
+    ticketsPerBooking=args.tickets_per_booking,
+    days=args.days,
+    start=args.start,
+    skew=args.skew,
+    seed=args.seed,
+  )
+
+  start = _TIME.perf_counter()
+  counts = generator.run()
+  elapsed = _TIME.perf_counter() - start
+
+  total = sum(counts.values())
+  for table, count in counts.items():
+    print(f"{table}: {count} rows")
+  print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)")
+
+
+
+if __name__ == "__main__":
+  main()
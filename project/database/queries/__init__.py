@@ -1,7 +1,11 @@
 import peewee as _PW
+import typing as _TYPING
+import uuid as _UUID
 from datetime import datetime as _DT
 
+from ..cache import refCache, userCache
 from ..client import dbClient
+from ..seatmap import SeatMap
 from ..schema import Schema
 
 
@@ -31,11 +35,21 @@ class _BaseQueries:
   table query class that extends this one.
   """
 
+  @classmethod
+  def invalidate_caches(cls) -> None:
+    """
+    Drop everything cached from this table, after it's written to. Call it 
+    with `dbClient.afterTransaction`, so it runs once the write is committed
+    """
+
+    refCache.invalidate(cls.table.__name__)
+
   @classmethod
   def delete_all(cls) -> None:
     """Delete every entry in this table"""
 
     cls.table.delete().execute()
+    dbClient.afterTransaction(cls.invalidate_caches)
 
   @classmethod
   def get_by_id(cls, id):
@@ -50,9 +64,65 @@ class _BaseQueries:
     except _PW.DoesNotExist:
       return None
 
-  # @staticmethod
-  # def update_or_create(**kwargs) -> type[table]:
-  #   pass
+  @classmethod
+  def upsert(cls, **fields) -> int:
+    """
+    Insert an entry, or update the entry with the same primary key, in a single
+    `INSERT ... ON CONFLICT DO UPDATE` statement
+
+    Returns the number of affected rows
+    """
+
+    return cls.upsert_many([fields])
+
+  @classmethod
+  def upsert_many(cls, rows: _TYPING.Iterable[dict], chunkSize: int = 1000) -> int:
+    """
+    Insert entries, or update the entries with the same primary keys, with one
+    `INSERT ... ON CONFLICT DO UPDATE` statement (in it's own transaction) for
+    every `chunkSize` rows
+
+    Each row is a dict of field names and values, fields that aren't in a chunk
+    are left as they are on existing entries
+
+    Returns the number of affected rows
+    """
+
+    meta = cls.table._meta
+    fields = meta.fields
+
+    if isinstance(meta.primary_key, _PW.CompositeKey):
+      keyNames = list(meta.primary_key.field_names)
+    else:
+      keyNames = [ meta.primary_key.name ]
+    keyFields = [ fields[name] for name in keyNames ]
+
+    affected = 0
+    for chunk in _PW.chunked(rows, chunkSize):
+      names = set().union(*chunk)
+
+      unknown = names - fields.keys()
+      if len(unknown) > 0:
+        raise ValueError(
+          f"The {cls.table.__name__} table doesn't have the fields: "
+          f"{", ".join(sorted(unknown))}"
+        )
+
+      query = cls.table.insert_many(chunk)
+
+      # Compared by name, `==` on fields builds SQL expressions
+      updated = [ fields[name] for name in names if name not in keyNames ]
+      if len(updated) > 0:
+        query = query.on_conflict(conflict_target=keyFields, preserve=updated)
+      else:
+        query = query.on_conflict_ignore()
+
+      with dbClient.transaction(write=True):
+        affected += query.as_rowcount().execute()
+
+    dbClient.afterTransaction(cls.invalidate_caches)
+
+    return affected
 
 # === ===
 
@@ -65,7 +135,7 @@ class Booking(_BaseQueries):
   table = dbClient.Tables.Booking
 
   @staticmethod
-  @dbClient.database.atomic()
+  @dbClient.transaction(write=True)
   def create(userId: str, filmId: str, datetime: _DT) -> Models.Booking | None:
     """
     Create a new booking
@@ -89,6 +159,277 @@ class Booking(_BaseQueries):
 
     return booking
 
+
+  @staticmethod
+  def create_with_tickets(
+    userId: str, filmId: str, datetime: _DT, ticketTypes: list[str]
+  ) -> Models.Booking | None:
+    """
+    Create a new booking and all of it's tickets in a fixed number of 
+    statements: one insert for the booking, one bulk insert for the tickets.
+
+    The `User` and `Film` entries are not fetched first, the foreign key 
+    constraints on the `Booking` table reject ids that don't exist.
+
+    The `TicketHolderType` ids are resolved from the reference data cache, so 
+    they cost no statements.
+
+    Return the entry, or `None` if any of the references are invalid
+    """
+
+    ticketTypeIds = TicketHolderType.ids_by_readable(ticketTypes)
+    if ticketTypeIds is None: return None  # unknown ticket type
+
+    try:
+      with dbClient.transaction(write=True):
+        booking = __class__.table.create(
+          user=userId,
+          film=filmId,
+          datetime=datetime
+        )
+
+        if len(ticketTypeIds) > 0:
+          Ticket.table.insert_many([
+            {
+              "booking": booking.id,
+              "holderType": ticketTypeId,
+              "paidPriceGBP": Ticket.PRICE_GBP
+            }
+            for ticketTypeId in ticketTypeIds
+          ]).execute()
+
+    except _PW.IntegrityError:  # user / film / ticket type doesn't exist
+      return None
+
+    return booking
+
+
+  @staticmethod
+  @dbClient.retryOnBusy()
+  def create_for_showing(
+    userId: str,
+    showingId: str,
+    ticketTypes: list[str],
+    seats: list[int] | None = None
+  ) -> Models.Booking | None:
+    """
+    Create a new booking and all of it's tickets for a showing, taking one of 
+    the showing's seats for each ticket.
+
+    If the showing has a seat map, each ticket is given a seat: the seats 
+    held with `Showing.hold_seats` if `seats` is given, otherwise the best 
+    free seats next to each other.
+
+    Without a seat map, the seats are checked and taken with a single 
+    conditional `UPDATE` at the start of a `BEGIN IMMEDIATE` transaction, so 
+    concurrent bookings can never take more seats than are left, and the 
+    write lock is only held for three statements. With one, the seat map is 
+    read and written back inside the same transaction, which nothing else can 
+    write to until it ends. The transaction is retried with backoff if SQLite 
+    is busy.
+
+    Return the entry, or `None` if the showing doesn't have enough seats left, 
+    the seats aren't held, or any of the references are invalid
+    """
+
+    ticketTypeIds = TicketHolderType.ids_by_readable(ticketTypes)
+    if ticketTypeIds is None: return None  # unknown ticket type
+
+    count = len(ticketTypeIds)
+    if count == 0: return None
+    if seats is not None and len(set(seats)) != count: return None
+
+    ShowingTable = Showing.table
+
+    try:
+      with dbClient.transaction(write=True):
+        showing: Models.Showing | None = None
+        ticketSeats: list[int | None] = [None] * count
+
+        if seats is None:
+          # Showings without a seat map only need the count of seats left
+          showings = list(ShowingTable
+            .update(remaining=ShowingTable.remaining - count)
+            .where(
+              (ShowingTable.id == showingId) &
+              ShowingTable.seatMap.is_null() &
+              (ShowingTable.remaining >= count)
+            )
+            .returning(ShowingTable.film, ShowingTable.startsAt)
+            .execute()
+          )
+          if len(showings) > 0: showing = showings[0]
+
+        if showing is None:
+          showing = ShowingTable.get_or_none(ShowingTable.id == showingId)
+          seatMap = None if showing is None else Showing.seat_map(showing)
+          if seatMap is None: return None  # sold out / doesn't exist
+
+          if seats is None:
+            ticketSeats = seatMap.bestAdjacent(count)
+            if ticketSeats is None: return None  # no free seats together
+
+            seatMap.hold(ticketSeats)
+            ShowingTable.update(
+              seatMap=seatMap.toBlob(),
+              remaining=ShowingTable.remaining - count
+            ).where(ShowingTable.id == showingId).execute()
+
+          else:
+            # The seats must be held (taken, but not by a ticket)
+            if (
+              not all(seatMap.isTaken(seat) for seat in seats) or
+              len(Showing.booked_seats(showingId, seats)) > 0
+            ): return None
+
+            ticketSeats = seats
+
+        booking = __class__.table.create(
+          user=userId,
+          film=showing.film_id,
+          datetime=showing.startsAt,
+          showing=showingId,
+        )
+
+        Ticket.table.insert_many([
+          {
+            "booking": booking.id,
+            "holderType": ticketTypeId,
+            "paidPriceGBP": Ticket.PRICE_GBP,
+            "seat": seat,
+          }
+          for ticketTypeId, seat in zip(ticketTypeIds, ticketSeats)
+        ]).execute()
+
+    except ValueError:  # invalid showing id / seat
+      return None
+    except _PW.IntegrityError:  # user / ticket type doesn't exist
+      return None
+
+    return booking
+
+
+  @staticmethod
+  def create_many(
+    records: _TYPING.Iterable[tuple[str, _DT, str, list[str]]],
+    chunkSize: int = 500,
+    transactions: int = 1
+  ) -> list[dict]:
+    """
+    Create many bookings and their tickets at once.
+
+    Each record is a `(userId, datetime, filmId, ticketTypes)` tuple.
+
+    The records are validated in bulk with set-based `IN (...)` queries 
+    against the `User`, `Film` and `TicketHolderType` tables, then the valid 
+    records are written with chunked `insert_many`s, spread evenly across 
+    `transactions` transactions.
+
+    If a transaction fails, every record in it fails.
+
+    Returns a result for each record, in order:
+    `{ "bookingId": str | None, "error": str | None }`
+    """
+
+    records = list(records)
+    results: list[dict] = [
+      { "bookingId": None, "error": None }
+      for _ in records
+    ]
+
+    # === Validate the records ===
+
+    userIds: list[_UUID.UUID | None] = []
+    for i, (userId, _, _, _) in enumerate(records):
+      try:
+        userIds.append(_UUID.UUID(str(userId)))
+      except ValueError:
+        userIds.append(None)
+        results[i]["error"] = "Invalid user id"
+
+    UserTable = User.table
+    existingUsers = set()
+    for chunk in _PW.chunked({ id for id in userIds if id is not None }, chunkSize):
+      existingUsers.update(
+        user.id for user in
+        UserTable.select(UserTable.id).where(UserTable.id.in_(chunk))
+      )
+
+    FilmTable = Film.table
+    existingFilms = set()
+    for chunk in _PW.chunked({ record[2] for record in records }, chunkSize):
+      existingFilms.update(
+        film.title for film in
+        FilmTable.select(FilmTable.title).where(FilmTable.title.in_(chunk))
+      )
+
+    ticketTypeIds = {
+      readable: type.id
+      for readable, type in TicketHolderType.all_by_readable().items()
+    }
+
+    for i, (_, _, filmId, ticketTypes) in enumerate(records):
+      if results[i]["error"] is not None: continue
+
+      if userIds[i] not in existingUsers:
+        results[i]["error"] = "User does not exist"
+      elif filmId not in existingFilms:
+        results[i]["error"] = "Film does not exist"
+      elif any(type not in ticketTypeIds for type in ticketTypes):
+        results[i]["error"] = "Unknown ticket type"
+
+    # === ===
+
+
+    # === Write the valid records ===
+
+    valid = [i for i, result in enumerate(results) if result["error"] is None]
+    if len(valid) == 0: return results
+
+    groupSize = -(-len(valid) // max(1, transactions))  # ceiling division
+
+    for group in _PW.chunked(valid, groupSize):
+      bookingIds = [_UUID.uuid4() for _ in group]
+
+      bookingRows = []
+      ticketRows = []
+      for i, bookingId in zip(group, bookingIds):
+        _, datetime, filmId, ticketTypes = records[i]
+
+        bookingRows.append({
+          "id": bookingId,
+          "user": userIds[i],
+          "film": filmId,
+          "datetime": datetime
+        })
+        ticketRows.extend(
+          {
+            "booking": bookingId,
+            "holderType": ticketTypeIds[type],
+            "paidPriceGBP": Ticket.PRICE_GBP
+          }
+          for type in ticketTypes
+        )
+
+      try:
+        with dbClient.transaction(write=True):
+          for chunk in _PW.chunked(bookingRows, chunkSize):
+            __class__.table.insert_many(chunk).execute()
+          for chunk in _PW.chunked(ticketRows, chunkSize):
+            Ticket.table.insert_many(chunk).execute()
+
+      except _PW.IntegrityError as error:
+        for i in group:
+          results[i]["error"] = str(error)
+        continue
+
+      for i, bookingId in zip(group, bookingIds):
+        results[i]["bookingId"] = str(bookingId)
+
+    # === ===
+
+    return results
+
 #endregion
 
 
@@ -99,6 +440,20 @@ class Film(_BaseQueries):
 
   table = dbClient.Tables.Film
 
+  @staticmethod
+  def all_by_title() -> dict[str, Models.Film]:
+    """
+    Get every entry keyed by it's title
+
+    Served from the reference data cache, don't mutate the result
+    """
+
+    return refCache.get("Film", "byTitle", lambda: {
+      film.title: film
+      for film in __class__.table.select()
+    })
+
+
   @staticmethod
   def get_by_title(title: str) -> Models.Film | None:
     """
@@ -107,12 +462,22 @@ class Film(_BaseQueries):
       - else -> return `None`
     """
 
-    try:
-      return dbClient.Tables.Film.get(
-        (__class__.table.title == title)
-      )
-    except _PW.DoesNotExist:
-      return None
+    return __class__.all_by_title().get(title)
+
+
+  @staticmethod
+  def get_or_create(title: str) -> Models.Film:
+    """
+    Attempts to find an entry by it's title:
+      - if not found -> create the entry
+
+    Returns the entry
+    """
+
+    entry, created = __class__.table.get_or_create(title=title)
+    if created: dbClient.afterTransaction(__class__.invalidate_caches)
+
+    return entry
 
 #endregion
 
@@ -124,33 +489,207 @@ class PermissionGroup(_BaseQueries):
 
   table = dbClient.Tables.PermissionGroup
 
+  @classmethod
+  def invalidate_caches(cls) -> None:
+    """Drop everything cached from this table, cached users have group names"""
+
+    refCache.invalidate(cls.table.__name__)
+    userCache.invalidate()
+
+  @staticmethod
+  def get_by_id(id) -> Models.PermissionGroup | None:
+    """
+    Attempts to find an entry by it's id
+      - if found -> return the entry
+      - else -> return `None`
+
+    Served from the reference data cache
+    """
+
+    groups = refCache.get("PermissionGroup", "byId", lambda: {
+      group.id: group
+      for group in __class__.table.select()
+    })
+
+    return groups.get(id)
+
+
   @staticmethod
-  @dbClient.database.atomic()
   def update_or_create(id: int, readable: str) -> Models.PermissionGroup:
     """
-    Attempts to find an entry by it's id:
-      - if not found -> create the entry
-      - if found -> update the entry
+    Creates the entry, or updates the entry with the same id, in one statement
 
     Returns the entry
     """
 
+    __class__.upsert(id=id, readable=readable)
+
+    return __class__.table(id=id, readable=readable)
+
+#endregion
+
+
+#region Showing
+
+class Showing(_BaseQueries):
+  """Queries for the `Showing` table"""
+
+  table = dbClient.Tables.Showing
+
+  @staticmethod
+  def create(
+    filmId: str,
+    startsAt: _DT,
+    capacity: int,
+    seatsPerRow: int | None = None
+  ) -> Models.Showing | None:
+    """
+    Create a new showing with all of it's seats remaining, and an empty seat 
+    map if `seatsPerRow` is given
+
+    Return the entry, or `None` if the film doesn't exist or is already showing 
+    at that time
+    """
+
+    seatMap = None
+    if seatsPerRow is not None:
+      if capacity % seatsPerRow != 0:
+        raise ValueError("Capacity must be a multiple of the seats per row")
+      seatMap = SeatMap(capacity // seatsPerRow, seatsPerRow).toBlob()
+
     try:
-      entry = __class__.get_by_id(id)
-      if entry is None: raise _PW.DoesNotExist
+      with dbClient.transaction(write=True):
+        return __class__.table.create(
+          film=filmId,
+          startsAt=startsAt,
+          capacity=capacity,
+          remaining=capacity,
+          seatsPerRow=seatsPerRow,
+          seatMap=seatMap,
+        )
+    except _PW.IntegrityError:
+      return None
 
-      __class__.table.update(
-        id=id,
-        readable=readable
-      )
 
-    except _PW.DoesNotExist:
-      entry = __class__.table.create(
-        id=id,
-        readable=readable
+  @staticmethod
+  def seat_map(showing: Models.Showing) -> SeatMap | None:
+    """The showing's seat map, `None` if it has unallocated seating"""
+
+    if showing.seatMap is None: return None
+
+    return SeatMap.fromBlob(
+      showing.seatMap,
+      showing.capacity // showing.seatsPerRow,
+      showing.seatsPerRow
+    )
+
+
+  @staticmethod
+  def booked_seats(showingId: str, seats: list[int] | None = None) -> list[int]:
+    """
+    Get the seats in the showing that tickets have been booked for, only 
+    those in `seats` if it's given
+    """
+
+    query = (Ticket.table
+      .select(Ticket.table.seat)
+      .join(Booking.table)
+      .where(
+        (Booking.table.showing == showingId) &
+        Ticket.table.seat.is_null(False)
       )
+    )
+    if seats is not None:
+      query = query.where(Ticket.table.seat.in_(seats))
 
-    return entry
+    return [ seat for (seat,) in query.tuples() ]
+
+
+  @staticmethod
+  @dbClient.retryOnBusy()
+  def hold_seats(showingId: str, count: int) -> list[int] | None:
+    """
+    Take the best `count` free seats next to each other in the showing's seat 
+    map, so they can be booked with `Booking.create_for_showing` later
+
+    Return the seats, or `None` if the showing doesn't have a seat map or 
+    enough free seats together
+    """
+
+    table = __class__.table
+
+    try:
+      with dbClient.transaction(write=True):
+        showing: Models.Showing | None = table.get_or_none(table.id == showingId)
+        if showing is None: return None
+
+        seatMap = __class__.seat_map(showing)
+        if seatMap is None: return None
+
+        seats = seatMap.bestAdjacent(count)
+        if seats is None: return None
+
+        seatMap.hold(seats)
+        table.update(
+          seatMap=seatMap.toBlob(),
+          remaining=table.remaining - count
+        ).where(table.id == showingId).execute()
+
+    except ValueError:  # invalid showing id
+      return None
+
+    return seats
+
+
+  @staticmethod
+  @dbClient.retryOnBusy()
+  def release_seats(showingId: str, seats: list[int]) -> int:
+    """
+    Free held seats in the showing's seat map, seats that have been booked 
+    are left taken
+
+    Return the number of seats freed
+    """
+
+    table = __class__.table
+
+    try:
+      with dbClient.transaction(write=True):
+        showing: Models.Showing | None = table.get_or_none(table.id == showingId)
+        if showing is None: return 0
+
+        seatMap = __class__.seat_map(showing)
+        if seatMap is None: return 0
+
+        booked = set(__class__.booked_seats(showingId, seats))
+        released = seatMap.release(
+          seat for seat in seats if seat not in booked
+        )
+        if released == 0: return 0
+
+        table.update(
+          seatMap=seatMap.toBlob(),
+          remaining=table.remaining + released
+        ).where(table.id == showingId).execute()
+
+    except ValueError:  # invalid showing id / seat
+      return 0
+
+    return released
+
+
+  @staticmethod
+  def all_by_film(filmId: str, after: _DT | None = None) -> list[Models.Showing]:
+    """
+    Get the film's showings in date order, only those starting after `after` 
+    if it's given
+    """
+
+    query = __class__.table.select().where(__class__.table.film == filmId)
+    if after is not None:
+      query = query.where(__class__.table.startsAt > after)
+
+    return list(query.order_by(__class__.table.startsAt))
 
 #endregion
 
@@ -162,9 +701,12 @@ class Ticket(_BaseQueries):
 
   table = dbClient.Tables.Ticket
 
+  PRICE_GBP = 5.00
+  """The price of every ticket, whatever it's holder type"""
+
 
   @staticmethod
-  @dbClient.database.atomic()
+  @dbClient.transaction(write=True)
   def create(bookingId: str, type: str) -> Models.Ticket | None:
     """
     Create a new ticket
@@ -183,7 +725,7 @@ class Ticket(_BaseQueries):
     ticket = __class__.table.create(
       booking=booking,
       holderType=ticketType,
-      paidPriceGBP=5.00
+      paidPriceGBP=__class__.PRICE_GBP
     )
 
     return ticket
@@ -198,49 +740,58 @@ class TicketHolderType(_BaseQueries):
 
   table = dbClient.Tables.TicketHolderType
 
+  @staticmethod
+  def all_by_readable() -> dict[str, Models.TicketHolderType]:
+    """
+    Get every entry keyed by it's readable name
+
+    Served from the reference data cache, don't mutate the result
+    """
+
+    return refCache.get("TicketHolderType", "byReadable", lambda: {
+      type.readable: type
+      for type in __class__.table.select().order_by(__class__.table.id)
+    })
+
+
   @staticmethod
   def get_by_readable(readable: str):
     """
-    Attempts to find an entry by it's id
+    Attempts to find an entry by it's readable name
       - if found -> return the entry
       - else -> return `None`
     """
 
+    return __class__.all_by_readable().get(readable)
+
+
+  @staticmethod
+  def ids_by_readable(readables: _TYPING.Iterable[str]) -> list[int] | None:
+    """
+    Get the id of the entry with each readable name, from the reference data 
+    cache
+      - if any of them aren't found -> return `None`
+    """
+
+    types = __class__.all_by_readable()
+
     try:
-      return __class__.table.get(
-        (__class__.table.readable == readable)
-      )
-    except _PW.DoesNotExist:
+      return [ types[readable].id for readable in readables ]
+    except KeyError:
       return None
 
 
   @staticmethod
-  @dbClient.database.atomic()
   def update_or_create(id: int, readable: str) -> Models.TicketHolderType:
     """
-    Attempts to find an entry by it's id:
-      - if not found -> create the entry
-      - if found -> update the entry
+    Creates the entry, or updates the entry with the same id, in one statement
 
     Returns the entry
     """
 
-    try:
-      entry = __class__.table.get_by_id(id)
-      if entry is None: raise _PW.DoesNotExist
-
-      __class__.table.update(
-        id=id,
-        readable=readable
-      )
+    __class__.upsert(id=id, readable=readable)
 
-    except _PW.DoesNotExist:
-      entry = __class__.table.create(
-        id=id,
-        readable=readable
-      )
-
-    return entry
+    return __class__.table(id=id, readable=readable)
 
 #endregion
 
@@ -252,6 +803,13 @@ class User(_BaseQueries):
 
   table = dbClient.Tables.User
 
+  @classmethod
+  def invalidate_caches(cls) -> None:
+    """Drop everything cached from this table, including cached users"""
+
+    refCache.invalidate(cls.table.__name__)
+    userCache.invalidate()
+
   @staticmethod
   def id_by_username(username: str) -> (int | None):
     """
@@ -271,7 +829,7 @@ class User(_BaseQueries):
 
 
   @staticmethod
-  @dbClient.database.atomic()
+  @dbClient.transaction(write=True)
   def create(username: str, password: str) -> Models.User | None:
     """
     Attempts to find an entry by it's username:
@@ -296,7 +854,7 @@ class User(_BaseQueries):
 
 
   @staticmethod
-  @dbClient.database.atomic()
+  @dbClient.transaction(write=True)
   def delete_then_create(username: str, password: str) -> Models.User:
     """
     Attempts to find an entry by it's username:
@@ -311,6 +869,7 @@ class User(_BaseQueries):
 
     if (userId is not None):
       __class__.table.delete_by_id(userId)
+      dbClient.afterTransaction(lambda: userCache.invalidate(userId))
 
     user = __class__.create(
       username=username,
@@ -322,7 +881,7 @@ class User(_BaseQueries):
 
 
   @staticmethod
-  @dbClient.database.atomic()
+  @dbClient.transaction(write=True)
   def delete_then_create_admin(username: str, password: str) -> Models.User:
     """
     Creates a User entry and gives them the `ADMIN` PermissionGroup
@@ -344,6 +903,7 @@ class User(_BaseQueries):
       user=adminUser,
       permissionGroup=adminPG
     )
+    dbClient.afterTransaction(lambda: userCache.invalidate(adminUser.id))
 
     return adminUser
 
@@ -357,6 +917,13 @@ class UserPermissionGroups(_BaseQueries):
 
   table = dbClient.Tables.UserPermissionGroups
 
+  @classmethod
+  def invalidate_caches(cls) -> None:
+    """Drop everything cached from this table, cached users have their groups"""
+
+    refCache.invalidate(cls.table.__name__)
+    userCache.invalidate()
+
 #endregion
 
 
@@ -369,6 +936,7 @@ class Queries:
     Booking               =  Booking
     Film                  =  Film
     PermissionGroup       =  PermissionGroup
+    Showing               =  Showing
     Ticket                =  Ticket
     TicketHolderType      =  TicketHolderType
     User                  =  User
@@ -0,0 +1,364 @@
+import concurrent.futures as _FUTURES
+import contextlib as _CONTEXTLIB
+import itertools as _ITERTOOLS
+import multiprocessing as _MP
+import pandas as _PD
+import peewee as _PW
+import typing as _TYPING
+from datetime import datetime as _DT
+
+from .client import dbClient as _dbClient
+from .queries import Queries as _dbQueries
+
+
+
+"""
+This script defines the sales reports: revenue per film per day, tickets sold
+by ticket holder type, and the busiest time slots.
+
+The tickets are read straight from SQL into `pandas` DataFrames with typed
+columns, a chunk of rows at a time, instead of building a Python dict for each
+booking. Each chunk is aggregated with vectorized `groupby`s, then the partial
+aggregates of every chunk are added up, so only one chunk of tickets is ever
+held in memory, however many there are.
+
+A report can also be split into partitions of the bookings' date time range,
+each scanned by a separate process, and their partial aggregates merged, see
+`Reports.parallelSales`.
+
+Reports read from the reporting connection, see `DBClient.reporting`.
+
+This module imports `pandas`, which is slow, so only import it when a report is
+run.
+"""
+
+
+
+TICKET_DTYPES = {
+  "film": "string",
+  "booking": "int64",
+  "holderType": "int16",
+  "pence": "int64",
+}
+"""Column types of the ticket frames (`datetime` is parsed separately)"""
+
+MONEY_COLUMNS = ["tickets", "pence"]
+"""Columns of the revenue and holder type aggregates"""
+
+SLOT_COLUMNS = ["tickets", "bookings"]
+"""Columns of the time slot aggregates"""
+
+
+
+class SalesReport(_TYPING.NamedTuple):
+  """The aggregates of a sales report, all money is in pence"""
+
+  revenueByFilmByDay: _PD.DataFrame
+  """Indexed by `(film, day)`, columns `tickets` and `pence`, sorted"""
+
+  ticketsByHolderType: _PD.DataFrame
+  """Indexed by `holderType` (name), columns `tickets` and `pence`"""
+
+  busiestSlots: _PD.DataFrame
+  """
+  Indexed by `(weekday, hour)` (Monday is 0), columns `tickets` and
+  `bookings`, busiest first
+  """
+
+
+
+class Reports:
+  """Class containing the sales reports"""
+
+  @staticmethod
+  def ticketsQuery(start: _DT | None = None, end: _DT | None = None):
+    """
+    Query with a row for every ticket: the booking's film, date time, rowid,
+    the ticket's holder type and the price paid in pence, only for bookings
+    from `start` (inclusive) to `end` (exclusive) if they're given.
+
+    With a range, the bookings are ordered by `(datetime, id)` so SQLite 
+    searches the `(datetime, id)` index for just the bookings in the range, 
+    instead of scanning every ticket and sorting them. Without one, they're 
+    ordered by rowid, as scanning the table is cheaper than walking the whole 
+    index. Either way SQLite finds each booking's tickets with the 
+    `(booking, holderType)` index, so a booking's tickets are next to each 
+    other. The integer rowid identifies the booking because it's much cheaper 
+    to read than the UUID.
+    """
+
+    Tables = _dbClient.Tables
+    Booking = Tables.Booking
+    Ticket = Tables.Ticket
+
+    rowid = _PW.Column(Booking, "rowid")
+
+    query = (Booking
+      .select(
+        Booking.film.alias("film"),
+        Booking.datetime.alias("datetime"),
+        rowid.alias("booking"),
+        Ticket.holderType.alias("holderType"),
+        _PW.fn.ROUND(Ticket.paidPriceGBP * 100).alias("pence"),
+      )
+      .join(Ticket)
+    )
+
+    if start is None and end is None:
+      return query.order_by(rowid)
+
+    if start is not None:
+      query = query.where(Booking.datetime >= start)
+    if end is not None:
+      query = query.where(Booking.datetime < end)
+
+    return query.order_by(Booking.datetime, Booking.id)
+
+
+  @staticmethod
+  def ticketFrames(
+    start: _DT | None = None,
+    end: _DT | None = None,
+    chunkSize: int = 100_000
+  ) -> _TYPING.Iterator[_PD.DataFrame]:
+    """
+    Generator that yields the tickets (see `ticketsQuery`) as DataFrames of at
+    most `chunkSize` rows, with typed columns.
+    """
+
+    sql, params = __class__.ticketsQuery(start, end).sql()
+
+    with _dbClient.reporting() as database:
+      yield from _PD.read_sql(
+        sql,
+        database.connection(),
+        params=params,
+        chunksize=chunkSize,
+        dtype=TICKET_DTYPES,
+        parse_dates={ "datetime": { "format": "ISO8601" } },
+      )
+
+
+  @staticmethod
+  def sales(
+    start: _DT | None = None,
+    end: _DT | None = None,
+    chunkSize: int = 100_000,
+    workers: int = 1
+  ) -> SalesReport:
+    """
+    Compute every sales report in one pass over the tickets, a chunk at a
+    time.
+
+    With more than one worker, the scan is split across a pool of processes,
+    see `parallelSales`.
+    """
+
+    if workers > 1:
+      return __class__.parallelSales(start, end, chunkSize, workers)
+
+    return __class__.mergeSales([__class__.partialSales(start, end, chunkSize)])
+
+
+  @staticmethod
+  def partialSales(
+    start: _DT | None = None,
+    end: _DT | None = None,
+    chunkSize: int = 100_000
+  ) -> SalesReport:
+    """
+    Aggregate the tickets of the bookings from `start` (inclusive) to `end`
+    (exclusive), a chunk at a time, ready to be merged with `mergeSales`: the
+    aggregates aren't sorted, and holder types are indexed by id.
+    """
+
+    revenue = []
+    holderTypes = []
+    slots = []
+    lastBooking = None
+
+    for frame in __class__.ticketFrames(start, end, chunkSize):
+      # No tickets gives a single empty frame, without types
+      if len(frame) == 0: continue
+
+      frame["day"] = frame["datetime"].dt.normalize()
+      frame["weekday"] = frame["datetime"].dt.weekday.astype("int8")
+      frame["hour"] = frame["datetime"].dt.hour.astype("int8")
+
+      revenue.append(frame
+        .groupby(["film", "day"], sort=False)
+        .agg(tickets=("pence", "size"), pence=("pence", "sum"))
+      )
+      holderTypes.append(frame
+        .groupby("holderType", sort=False)
+        .agg(tickets=("pence", "size"), pence=("pence", "sum"))
+      )
+
+      slot = (frame
+        .groupby(["weekday", "hour"], sort=False)
+        .agg(tickets=("pence", "size"), bookings=("booking", "nunique"))
+      )
+      # The tickets of a booking are next to each other (see `ticketsQuery`), 
+      # so only the first booking of a chunk can have been counted in the 
+      # previous chunk
+      first = frame.iloc[0]
+      if first["booking"] == lastBooking:
+        slot.loc[(first["weekday"], first["hour"]), "bookings"] -= 1
+      lastBooking = frame["booking"].iat[-1]
+      slots.append(slot)
+
+    return SalesReport(
+      __class__._combine(revenue, ["film", "day"], MONEY_COLUMNS),
+      __class__._combine(holderTypes, ["holderType"], MONEY_COLUMNS),
+      __class__._combine(slots, ["weekday", "hour"], SLOT_COLUMNS),
+    )
+
+
+  @staticmethod
+  def mergeSales(partials: list[SalesReport]) -> SalesReport:
+    """
+    Add up the partial aggregates from `partialSales`, then name the holder
+    types and sort.
+
+    Every booking must only be in one of the partials, otherwise it's counted
+    more than once in `busiestSlots`.
+    """
+
+    revenueByFilmByDay = __class__._combine(
+      [ partial.revenueByFilmByDay for partial in partials ],
+      ["film", "day"], MONEY_COLUMNS
+    ).sort_index()
+
+    names = {
+      type.id: type.readable.title()
+      for type in _dbQueries.Tables.TicketHolderType.all_by_readable().values()
+    }
+
+    ticketsByHolderType = __class__._combine(
+      [ partial.ticketsByHolderType for partial in partials ],
+      ["holderType"], MONEY_COLUMNS
+    )
+    ticketsByHolderType.index = ticketsByHolderType.index.map(names)
+    ticketsByHolderType = ticketsByHolderType.sort_index().sort_values(
+      "tickets", ascending=False, kind="stable"
+    )
+
+    # Sorted by index first, so ties are in the same order however the 
+    # tickets were partitioned
+    busiestSlots = __class__._combine(
+      [ partial.busiestSlots for partial in partials ],
+      ["weekday", "hour"], SLOT_COLUMNS
+    ).sort_index().sort_values(
+      ["tickets", "bookings"], ascending=False, kind="stable"
+    )
+
+    return SalesReport(revenueByFilmByDay, ticketsByHolderType, busiestSlots)
+
+
+  @staticmethod
+  def partitions(
+    start: _DT | None, end: _DT | None, count: int
+  ) -> list[tuple[_DT | None, _DT | None]]:
+    """
+    Split the bookings from `start` to `end` into `count` partitions that
+    span equal lengths of time, as `(start, end)` ranges (end exclusive).
+
+    Every booking is in exactly one partition.
+    """
+
+    Booking = _dbClient.Tables.Booking
+
+    # Found with the `(datetime, id)` index, without scanning the bookings
+    query = Booking.select(
+      _PW.fn.MIN(Booking.datetime), _PW.fn.MAX(Booking.datetime)
+    )
+    if start is not None:
+      query = query.where(Booking.datetime >= start)
+    if end is not None:
+      query = query.where(Booking.datetime < end)
+
+    with _dbClient.reporting() as database:
+      first, last = list(query.tuples().execute(database))[0]
+
+    if first is None or count < 2: return [(start, end)]
+
+    step = (last - first) / count
+    bounds = [ first + step * i for i in range(1, count) ]
+
+    return list(zip([start, *bounds], [*bounds, end]))
+
+
+  @staticmethod
+  def parallelSales(
+    start: _DT | None = None,
+    end: _DT | None = None,
+    chunkSize: int = 100_000,
+    workers: int = 2,
+    partitions: int | None = None
+  ) -> SalesReport:
+    """
+    Compute every sales report with a pool of `workers` processes.
+
+    The bookings' date time range is split into `partitions` (4 per worker by 
+    default, so workers that finish early take another). Each partition is 
+    scanned and aggregated by a worker, with it's own connection, then the 
+    partial aggregates are merged.
+
+    Workers read the database the same way as this process 
+    (`config.reporting`). In `"snapshot"` mode they read the snapshot the 
+    partitions were found in, which is kept until they're done.
+    """
+
+    with _CONTEXTLIB.ExitStack() as stack:
+      with _dbClient.reporting() as database:
+        ranges = __class__.partitions(start, end, partitions or workers * 4)
+        snapshot = stack.enter_context(
+          _dbClient.keepSnapshot(database.snapshotPath)
+        )
+
+      # Spawned (not forked) processes, so they don't share this process' 
+      # connections. They inherit it's environment, so use the same database
+      pool = stack.enter_context(_FUTURES.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_MP.get_context("spawn"),
+        initializer=_initWorker,
+        initargs=(_dbClient.config.reporting, snapshot),
+      ))
+      partials = list(pool.map(_partialSales, ranges, _ITERTOOLS.repeat(chunkSize)))
+
+    return __class__.mergeSales(partials)
+
+
+  @staticmethod
+  def _combine(
+    partials: list[_PD.DataFrame], keys: list[str], columns: list[str]
+  ) -> _PD.DataFrame:
+    """Add up partial aggregates (of chunks or partitions)"""
+
+    partials = [ partial for partial in partials if len(partial) > 0 ]
+
+    if len(partials) == 0:
+      return _PD.DataFrame(
+        { column: [] for column in columns },
+        index=_PD.MultiIndex.from_arrays([[]] * len(keys), names=keys),
+        dtype="int64",
+      )
+
+    return _PD.concat(partials).groupby(level=keys, sort=False).sum()
+
+
+
+def _initWorker(reporting: str, snapshot: str | None):
+  """Set up a report worker process to read like the process that started it"""
+
+  if snapshot is not None:
+    _dbClient.readSnapshot(snapshot)
+  else:
+    _dbClient.config.reporting = reporting
+
+
+def _partialSales(bounds: tuple[_DT | None, _DT | None], chunkSize: int):
+  """Aggregate one partition in a report worker process"""
+
+  start, end = bounds
+  return Reports.partialSales(start, end, chunkSize)
@@ -1,8 +1,9 @@
-from .models import Models as _Models
+from .models import Models as _Models, VERSION as _VERSION
 from .enums import ENUMs as _ENUMs
 from .utils import Utils as _Utils
 
 class Schema:
+  VERSION =  _VERSION
   Models  =  _Models
   ENUMs   =  _ENUMs
   Utils   =  _Utils
@@ -36,6 +36,15 @@ but if you do, maybe you can improve this comment.
 dbProxy = _PW.DatabaseProxy()
 
 
+VERSION = 3
+"""
+The version of the schema, stored in the database with `PRAGMA user_version`.
+
+Bump this whenever a table, field or index is added, removed or changed, so 
+existing databases get updated the next time they are opened.
+"""
+
+
 # === Define a class to extend when creating the schema for db tables ===
 
 class BaseModel(_PW.Model):
@@ -146,6 +155,70 @@ class Film(BaseModel):
 
 
 
+class Showing(BaseModel):
+  """Showings of films, each with a limited number of seats"""
+
+  id = _Fields.PkUUID.create()
+  """UUID primary key"""
+
+  film = _PW.ForeignKeyField(Film,
+    backref="showings",
+    on_update="CASCADE",
+    on_delete="CASCADE",
+    index=False,  # covered by the `(film, startsAt)` index
+  )
+  """Entry in `Film` table"""
+
+  startsAt = _PW.DateTimeField(
+    null=False
+  )
+  """Date & time the showing starts"""
+
+  capacity = _PW.IntegerField(
+    null=False
+  )
+  """Number of seats"""
+
+  remaining = _PW.IntegerField(
+    null=False
+  )
+  """
+  Number of seats that haven't been booked yet
+
+  Kept on the showing (instead of counting tickets) so a booking can check and 
+  take seats in a single `UPDATE`
+  """
+
+  seatsPerRow = _PW.IntegerField(
+    null=True
+  )
+  """
+  Number of seats in each row, `capacity` must be a multiple of it
+
+  `None` if the showing has unallocated seating (no seat map)
+  """
+
+  seatMap = _PW.BlobField(
+    null=True
+  )
+  """
+  Bitset of the seats that are taken (held or booked), one bit per seat, see 
+  `project.database.seatmap`
+  """
+
+  class Meta(BaseMeta):
+    indexes = (
+      # A film's showings in date order, a film can't be shown twice at once
+      (("film", "startsAt"), True),
+      # Every showing in date order
+      (("startsAt",), False),
+    )
+    constraints = [
+      _PW.Check("remaining BETWEEN 0 AND capacity"),
+    ]
+
+
+
 class Booking(BaseModel):
   """Bookings for films made by users"""
 
@@ -154,8 +227,9 @@ class Booking(BaseModel):
 
   user = _PW.ForeignKeyField(User,
     backref="bookings",
-    on_update="CASCADE"
+    on_update="CASCADE",
     # Do not delete bookings if the user has been deleted
+    index=False,  # covered by the `(user, datetime)` index
   )
   """Entry in `User` table"""
 
@@ -163,6 +237,7 @@ class Booking(BaseModel):
     backref="bookings",
     on_update="CASCADE",
     on_delete="CASCADE",
+    index=False,  # covered by the `(film, datetime)` index
   )
   """Entry in `Film` table"""
 
@@ -172,11 +247,31 @@ class Booking(BaseModel):
   """
   Date & time of the showing of the film
 
-  We assume that all films are always showing so a user can make a booking for 
-  any film at any time, because this is just a College assignment, and not the 
-  real world :)
+  Bookings without a `showing` can be for any film at any time, as if every 
+  film is always showing, because this is just a College assignment, and not 
+  the real world :)
   """
 
+  showing = _PW.ForeignKeyField(Showing,
+    backref="bookings",
+    on_update="CASCADE",
+    null=True,
+  )
+  """
+  Entry in `Showing` table, if the booking took seats from a showing (`film` 
+  and `datetime` are copied from it)
+  """
+
+  class Meta(BaseMeta):
+    indexes = (
+      # A user's bookings in date order
+      (("user", "datetime"), False),
+      # A film's bookings in date order
+      (("film", "datetime"), False),
+      # Every booking in date order (keyset pagination)
+      (("datetime", "id"), False),
+    )
+
 
 
 class TicketHolderType(BaseModel):
@@ -208,6 +303,7 @@ class Ticket(BaseModel):
     backref="tickets",
     on_update="CASCADE",
     on_delete="CASCADE",
+    index=False,  # covered by the `(booking, holderType)` index
   )
   """Entry in `Booking` table"""
 
@@ -236,6 +332,19 @@ class Ticket(BaseModel):
   because of potential price changes / deals.
   """
 
+  seat = _PW.IntegerField(
+    null=True
+  )
+  """
+  The number of the seat in the booking's showing's seat map, if it has one
+  """
+
+  class Meta(BaseMeta):
+    indexes = (
+      # A booking's tickets, grouped by type
+      (("booking", "holderType"), False),
+    )
+
 #endregion
 
 
@@ -249,6 +358,7 @@ class Models:
   PermissionGroup       =  PermissionGroup
   UserPermissionGroups  =  UserPermissionGroups
   Film                  =  Film
+  Showing               =  Showing
   Booking               =  Booking
   TicketHolderType      =  TicketHolderType
   Ticket                =  Ticket
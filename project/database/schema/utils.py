@@ -1,6 +1,7 @@
 import peewee as _PW
+import playhouse.migrate as _MIGRATE
 
-from .models import dbProxy as _dbProxy, Models as _Models
+from .models import dbProxy as _dbProxy, Models as _Models, VERSION as _VERSION
 
 
 
@@ -21,15 +22,105 @@ class Utils:
   @staticmethod
   def createTables(database: _PW.Database):
     """
-    Initialise the database proxy and create all tables defined in the schema.
+    Initialise the database proxy, create all tables defined in the schema, 
+    and any of their columns and indexes that are missing.
 
     Returns all the tables.
     """
 
     __class__.initializeProxy(database)
 
-    database.create_tables(_Models.all)
+    with database.atomic():
+      for model in _PW.sort_models(_Models.all):
+        model._schema.create_table(safe=True)
+
+      __class__.addMissingColumns(database)
+      __class__.createMissingIndexes(database)
 
     return _Models
 
+
+  @staticmethod
+  def ensureSchema(database: _PW.SqliteDatabase) -> bool:
+    """
+    Create the tables and indexes, unless the schema version stored in the 
+    database already matches `VERSION`, in which case nothing needs doing.
+
+    Returns `True` if the schema was created / updated.
+    """
+
+    if database.pragma("user_version") == _VERSION: return False
+
+    __class__.createTables(database)
+    database.pragma("user_version", _VERSION)
+
+    return True
+
+
+  @staticmethod
+  def addMissingColumns(database: _PW.SqliteDatabase) -> list[str]:
+    """
+    Add the fields declared in the schema that don't have a column in the 
+    database yet, e.g. after adding a field to a `Model`, with 
+    `playhouse.migrate`.
+
+    New fields must be nullable or have a default, so existing rows have a 
+    value for them.
+
+    Returns the names of the columns that were added, as `table.column`.
+    """
+
+    migrator = _MIGRATE.SqliteMigrator(database)
+    operations = []
+    added: list[str] = []
+
+    for model in _Models.all:
+      table = model._meta.table_name
+      existing = { column.name for column in database.get_columns(table) }
+
+      for field in model._meta.sorted_fields:
+        if field.column_name in existing: continue
+
+        if not field.null and field.default is None:
+          raise Exception(
+            f"Can't add the {table}.{field.column_name} column to existing "
+            f"rows, new fields must be nullable or have a default"
+          )
+
+        operations.append(migrator.add_column(table, field.column_name, field))
+        added.append(f"{table}.{field.column_name}")
+
+    _MIGRATE.migrate(*operations)
+
+    return added
+
+
+  @staticmethod
+  def createMissingIndexes(database: _PW.Database) -> list[str]:
+    """
+    Create the indexes declared in the schema that don't exist in the database 
+    yet, e.g. after adding an index to a `Model`.
+
+    Existing tables are left as they are, so this is cheap to run against an 
+    existing database.
+
+    Returns the names of the indexes that were created.
+    """
+
+    created: list[str] = []
+
+    for model in _Models.all:
+      existing = {
+        index.name
+        for index in database.get_indexes(model._meta.table_name)
+      }
+
+      for index in model._meta.fields_to_index():
+        if index._name in existing: continue
+
+        database.execute(model._schema._create_index(index, safe=True))
+        created.append(index._name)
+
+    return created
+
 #endregion
@@ -0,0 +1,185 @@
+import typing as _TYPING
+
+
+
+"""
+This script defines the seat maps of showings.
+
+A seat map is a bitset with one bit per seat, set if the seat is taken (held or
+booked). It is stored on the showing as a `BLOB` of `ceil(seats / 8)` bytes, so
+a 10,000 seat auditorium only takes 1.25KB.
+
+Seats are numbered from 0, row by row from the front (nearest the screen),
+left to right. Seat `n` is bit `n` of the bitset, so each row is a contiguous
+run of bits, and finding free seats next to each other is a few shifts and
+`&`s of Python `int`s instead of a loop over every seat.
+"""
+
+
+
+class SeatMap:
+  """The seats of a showing, and which of them are taken"""
+
+  def __init__(self, rows: int, seatsPerRow: int, taken: int = 0):
+    if rows < 1 or seatsPerRow < 1:
+      raise ValueError("A seat map needs at least one row and one seat per row")
+
+    self.rows = rows
+    self.seatsPerRow = seatsPerRow
+
+    self.taken = taken
+    """Bitset of the seats that are taken, bit `n` is seat `n`"""
+
+    self._rowMask = (1 << seatsPerRow) - 1
+    """Bitset of every seat in the first row"""
+
+
+  @classmethod
+  def fromBlob(cls, blob: bytes, rows: int, seatsPerRow: int) -> "SeatMap":
+    """Load a seat map stored with `toBlob`"""
+
+    return cls(rows, seatsPerRow, int.from_bytes(blob, "little"))
+
+
+  def toBlob(self) -> bytes:
+    """The seat map as bytes, to store in the database"""
+
+    return self.taken.to_bytes((self.capacity + 7) // 8, "little")
+
+
+  @property
+  def capacity(self) -> int:
+    """Number of seats"""
+
+    return self.rows * self.seatsPerRow
+
+
+  @property
+  def takenCount(self) -> int:
+    """Number of seats that are taken"""
+
+    return self.taken.bit_count()
+
+
+  def isTaken(self, seat: int) -> bool:
+    """Whether a seat is taken"""
+
+    return bool(self.taken >> seat & 1)
+
+
+  def takenSeats(self) -> list[int]:
+    """Every seat that is taken, in order"""
+
+    # Go a byte at a time, skipping bytes with no seats taken
+    return [
+      index * 8 + bit
+      for index, byte in enumerate(self.toBlob()) if byte
+      for bit in range(8) if byte >> bit & 1
+    ]
+
+
+  def label(self, seat: int) -> str:
+    """
+    A seat's human readable name, its row letter(s) and number in the row,
+    e.g. `"A1"`, `"C12"` or `"AB3"`
+    """
+
+    row, column = divmod(seat, self.seatsPerRow)
+
+    # Rows are lettered A to Z, then AA to AZ, BA ...
+    letters = ""
+    row += 1
+    while row > 0:
+      row, letter = divmod(row - 1, 26)
+      letters = chr(ord("A") + letter) + letters
+
+    return f"{letters}{column + 1}"
+
+
+  def _rowOrder(self) -> list[int]:
+    """
+    Rows from best to worst. The best row is two thirds of the way back, then
+    rows get worse the further they are from it, front rows before back rows
+    when they are the same distance.
+    """
+
+    best = (self.rows * 2) // 3
+    return sorted(range(self.rows), key=lambda row: (abs(row - best), -row))
+
+
+  def bestAdjacent(self, count: int) -> list[int] | None:
+    """
+    The best `count` free seats next to each other in one row, or `None` if no
+    row has that many free seats together.
+
+    Seats in the best row (see `_rowOrder`) win, and within a row, the seats
+    nearest the middle.
+    """
+
+    if count < 1 or count > self.seatsPerRow: return None
+
+    # Where the first seat goes to centre the seats in the row
+    centre = (self.seatsPerRow - count) // 2
+
+    for row in self._rowOrder():
+      free = ~(self.taken >> (row * self.seatsPerRow)) & self._rowMask
+
+      # Bit `n` of `starts` is set if seats `n` to `n + count - 1` are free.
+      # Doubling the run length each step only takes log2(count) steps
+      starts, length = free, 1
+      while length < count:
+        step = min(length, count - length)
+        starts &= starts >> step
+        length += step
+
+      if starts == 0: continue
+
+      # The free run starting closest to the centre, on either side
+      after = starts >> centre
+      before = starts & ((1 << (centre + 1)) - 1)
+
+      candidates = []
+      if after:
+        candidates.append(centre + (after & -after).bit_length() - 1)
+      if before:
+        candidates.append(before.bit_length() - 1)
+
+      start = min(candidates, key=lambda column: abs(column - centre))
+      first = row * self.seatsPerRow + start
+      return list(range(first, first + count))
+
+    return None
+
+
+  def hold(self, seats: _TYPING.Iterable[int]):
+    """
+    Take seats, raises `ValueError` if any of them don't exist or are already
+    taken (and takes none of them)
+    """
+
+    bits = self._bits(seats)
+    if self.taken & bits:
+      raise ValueError("Seat already taken")
+
+    self.taken |= bits
+
+
+  def release(self, seats: _TYPING.Iterable[int]) -> int:
+    """Free seats, returns how many of them were taken"""
+
+    bits = self._bits(seats) & self.taken
+    self.taken &= ~bits
+
+    return bits.bit_count()
+
+
+  def _bits(self, seats: _TYPING.Iterable[int]) -> int:
+    """Bitset of seats, raises `ValueError` if a seat doesn't exist"""
+
+    bits = 0
+    for seat in seats:
+      if not 0 <= seat < self.capacity:
+        raise ValueError(f"Seat {seat} doesn't exist")
+      bits |= 1 << seat
+
+    return bits
@@ -1,4 +1,10 @@
-from .client import dbClient
+import argparse as _ARGPARSE
+import csv as _CSV
+import json as _JSON
+import os as _OS
+import time as _TIME
+import typing as _TYPING
+
 from .queries import Queries as dbQueries
 from .schema.enums import ENUMs as _ENUMs
 
@@ -10,6 +16,15 @@ using the application.
 
 We also create a "root" admin user here because only admins can create more 
 admins.
+
+Reference data (e.g. a film catalogue) can also be loaded from CSV, JSON or 
+JSON Lines files, one table per file:
+```
+uv run -m project.database.seed --load Film films.csv --load TicketHolderType types.json
+```
+CSV files need a header row of field names, JSON files hold an array of 
+objects, JSON Lines files hold one object per line. Existing entries are 
+updated.
 """
 
 
@@ -36,35 +51,131 @@ FILM_TITLES = [
 
 
 
+#region Loading
+# === Load reference data in bulk ===
+
+LOADABLE_TABLES = ["Film", "PermissionGroup", "TicketHolderType"]
+"""Tables that can be loaded from files"""
+
+
+def readRows(path: str) -> _TYPING.Iterator[dict]:
+  """
+  Generator that yields the rows in a CSV, JSON or JSON Lines file.
+
+  CSV and JSON Lines files are read one row at a time, JSON files are read 
+  whole.
+  """
+
+  extension = _OS.path.splitext(path)[1].lower()
+  if extension not in (".csv", ".json", ".jsonl"):
+    raise ValueError(
+      f"Can't load \"{path}\", expected a .csv, .json or .jsonl file"
+    )
+
+  with open(path, newline="", encoding="utf-8") as file:
+    if extension == ".csv":
+      yield from _CSV.DictReader(file)
+
+    elif extension == ".jsonl":
+      for line in file:
+        if line.strip() != "": yield _JSON.loads(line)
+
+    else:
+      yield from _JSON.load(file)
+
+
+def loadRows(table: str, rows: _TYPING.Iterable[dict], chunkSize: int = 1000):
+  """
+  Insert or update (by primary key) rows of a reference table.
+
+  The rows are streamed `chunkSize` at a time, each chunk is written with one 
+  `INSERT ... ON CONFLICT DO UPDATE` in it's own transaction.
+
+  Returns the number of rows read, and the number of entries inserted or 
+  updated.
+  """
+
+  if table not in LOADABLE_TABLES:
+    raise ValueError(
+      f"Can't load the {table} table, expected one of {", ".join(LOADABLE_TABLES)}"
+    )
+
+  read = 0
+  def counted():
+    nonlocal read
+    for row in rows:
+      read += 1
+      yield row
+
+  queries: type = getattr(dbQueries.Tables, table)
+  affected = queries.upsert_many(counted(), chunkSize=chunkSize)
+
+  return read, affected
+
+# === ===
+#endregion
+
+
+
 #region Seeding
 # === Populate the database with seed data ===
 
+def seed():
+  """Populate the database with the seed data"""
 
-# Films from the Film Catalogue
-for filmTitle in FILM_TITLES:
-  dbClient.Tables.Film.get_or_create(
-    title=filmTitle
-  )
+  # Films from the Film Catalogue
+  loadRows("Film", [ { "title": title } for title in FILM_TITLES ])
 
-# Permission groups
-for group in _ENUMs.PermissionGroup_ENUM:
-  dbQueries.Tables.PermissionGroup.update_or_create(
-    id=group.value,
-    readable=group.name
-  )
+  # Permission groups
+  loadRows("PermissionGroup", [
+    { "id": group.value, "readable": group.name }
+    for group in _ENUMs.PermissionGroup_ENUM
+  ])
 
-# Ticket holder types
-for type in _ENUMs.TicketHolderType_ENUM:
-  dbQueries.Tables.TicketHolderType.update_or_create(
-    id=type.value,
-    readable=type.name
-  )
+  # Ticket holder types
+  loadRows("TicketHolderType", [
+    { "id": type.value, "readable": type.name }
+    for type in _ENUMs.TicketHolderType_ENUM
+  ])
 
-# Admin User
-dbQueries.Tables.User.delete_then_create_admin(
-  username=ADMIN_USER["username"],
-  password=ADMIN_USER["password"]
-)
+  # Admin User
+  dbQueries.Tables.User.delete_then_create_admin(
+    username=ADMIN_USER["username"],
+    password=ADMIN_USER["password"]
+  )
 
 # === ===
 #endregion
+
+
+
+def main():
+  parser = _ARGPARSE.ArgumentParser(
+    description="Seed the database, or load reference data from files"
+  )
+  parser.add_argument("--load", nargs=2, action="append",
+    metavar=("TABLE", "FILE"),
+    help=f"load a .csv, .json or .jsonl file into a table "
+      f"({", ".join(LOADABLE_TABLES)}), instead of seeding")
+  parser.add_argument("--chunk-size", type=int, default=1000,
+    help="rows written in each transaction")
+  args = parser.parse_args()
+
+  if args.load is None:
+    seed()
+    return
+
+  for table, path in args.load:
+    start = _TIME.perf_counter()
+    count, affected = loadRows(table, readRows(path), chunkSize=args.chunk_size)
+    elapsed = _TIME.perf_counter() - start
+
+    print(
+      f"{table}: {count} rows from {path} ({affected} inserted or updated) "
+      f"in {elapsed:.2f}s ({count / elapsed:.0f} rows/s)"
+    )
+
+
+
+if __name__ == "__main__":
+  main()
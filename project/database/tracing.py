@@ -0,0 +1,202 @@
+import re as _RE
+import sys as _SYS
+import threading as _THREADING
+import types as _TYPES
+
+
+
+"""
+This script defines an opt-in tracer for the SQL statements the database client
+executes.
+
+Every statement is timed and grouped by the `Database` / `Queries` method that
+(eventually) executed it. Statements with the same shape repeated within a
+single call of a method are flagged as N+1 suspects, e.g. looking up a ticket's
+holder type once per ticket instead of once per booking.
+
+Turn it on with the `DTS_DB_TRACE=1` environment variable (a summary is printed
+when the process exits), or with `dbClient.enableTracing()`.
+"""
+
+
+
+TRACED_MODULES = {
+  "project.database": "",
+  "project.database.queries": "Queries.Tables.",
+}
+"""Modules whose functions statements are attributed to, and their prefixes"""
+
+TRANSACTION_KEYWORDS = { "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE" }
+"""Statements that are never N+1 suspects, they just wrap the real ones"""
+
+
+
+class MethodTrace:
+  """Everything the tracer recorded for one method"""
+
+  def __init__(self):
+    self.calls = 0
+    self.statements = 0
+    self.seconds = 0.0
+
+    self.suspects: dict[str, int] = {}
+    """N+1 suspect statement shapes, and the most times one call repeated them"""
+
+
+  def toDict(self):
+    return {
+      "calls": self.calls,
+      "statements": self.statements,
+      "seconds": self.seconds,
+      "suspects": dict(self.suspects),
+    }
+
+
+
+class _Call:
+  """A call of a traced method that is still running"""
+
+  def __init__(self, frame: _TYPES.FrameType, method: str):
+    self.frame = frame
+    """
+    Frame of the call. Holding a reference keeps the frame alive, so another
+    call can't be mistaken for this one by reusing it's memory
+    """
+
+    self.method = method
+
+    self.shapes: dict[str, int] = {}
+    """How many times each statement shape was executed"""
+
+
+
+class Tracer:
+  """Records executed SQL statements grouped by the method that executed them"""
+
+  SHAPE_PATTERNS = [
+    # `IN (?, ?, ?)` -> `IN (?)`
+    (_RE.compile(r"\(\?(?:, \?)*\)"), "(?)"),
+    # `VALUES (?), (?), (?)` -> `VALUES (?)`
+    (_RE.compile(r"\(\?\)(?:, \(\?\))+"), "(?)"),
+  ]
+
+
+  def __init__(self, repeatThreshold: int = 3):
+    self.repeatThreshold = repeatThreshold
+    """Times a statement shape must repeat in one call to be an N+1 suspect"""
+
+    self._lock = _THREADING.Lock()
+    self._calls: dict[int, _Call] = {}
+    """The running call of each thread"""
+
+    self.methods: dict[str, MethodTrace] = {}
+
+
+  @staticmethod
+  def shape(sql: str) -> str:
+    """The statement with it's variable length parameter lists collapsed"""
+
+    for pattern, replacement in __class__.SHAPE_PATTERNS:
+      sql = pattern.sub(replacement, sql)
+    return sql
+
+
+  @staticmethod
+  def findCaller() -> tuple[_TYPES.FrameType | None, str]:
+    """
+    Find the outermost frame of a `Database` / `Queries` method on this
+    thread's stack, and the method's name.
+    """
+
+    frame = _SYS._getframe(2)
+    outermost = None
+    method = "<other>"
+
+    while frame is not None:
+      prefix = TRACED_MODULES.get(frame.f_globals.get("__name__", ""))
+      if prefix is not None:
+        outermost = frame
+        method = f"{prefix}{frame.f_code.co_qualname}"
+      frame = frame.f_back
+
+    return outermost, method
+
+
+  def record(self, sql: str, seconds: float):
+    """Record an executed statement"""
+
+    frame, method = __class__.findCaller()
+    shape = __class__.shape(sql)
+    thread = _THREADING.get_ident()
+
+    with self._lock:
+      call = self._calls.get(thread)
+      if call is None or call.frame is not frame or frame is None:
+        if call is not None: self._finish(call)
+        call = self._calls[thread] = _Call(frame, method)  # type: ignore
+
+      call.shapes[shape] = call.shapes.get(shape, 0) + 1
+
+      trace = self.methods.setdefault(call.method, MethodTrace())
+      trace.statements += 1
+      trace.seconds += seconds
+
+
+  def _finish(self, call: _Call):
+    """Count a call that has finished, and check it for N+1 suspects"""
+
+    trace = self.methods.setdefault(call.method, MethodTrace())
+    trace.calls += 1
+
+    for shape, count in call.shapes.items():
+      if shape.split(" ", 1)[0] in TRANSACTION_KEYWORDS: continue
+      if count >= self.repeatThreshold:
+        trace.suspects[shape] = max(trace.suspects.get(shape, 0), count)
+
+
+  def flush(self):
+    """Finish every running call so it's included in the summary"""
+
+    with self._lock:
+      for call in self._calls.values():
+        self._finish(call)
+      self._calls.clear()
+
+
+  def summary(self) -> dict[str, dict]:
+    """Everything recorded so far, by method"""
+
+    self.flush()
+    with self._lock:
+      return { name: trace.toDict() for name, trace in self.methods.items() }
+
+
+  def report(self) -> str:
+    """A readable summary, methods that executed the most statements first"""
+
+    summary = sorted(
+      self.summary().items(),
+      key=lambda item: item[1]["statements"],
+      reverse=True
+    )
+
+    lines = ["SQL trace (method: calls, statements, total ms)"]
+    for name, trace in summary:
+      calls = trace["calls"]
+      perCall = trace["statements"] / calls if calls > 0 else 0
+      lines.append(
+        f"  {name}: {calls} calls, {trace["statements"]} statements "
+        f"({perCall:.1f}/call), {trace["seconds"] * 1000:.1f}ms"
+      )
+      for shape, count in trace["suspects"].items():
+        lines.append(f"    N+1 suspect, {count}x in one call: {shape}")
+
+    return "\n".join(lines)
+
+
+  def reset(self):
+    """Forget everything recorded so far"""
+
+    with self._lock:
+      self._calls.clear()
+      self.methods.clear()
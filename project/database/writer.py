@@ -0,0 +1,212 @@
+import concurrent.futures as _FUTURES
+import queue as _QUEUE
+import threading as _THREADING
+import time as _TIME
+import typing as _TYPING
+
+from . import Database as _Database
+from .client import dbClient as _dbClient
+
+
+
+"""
+This script defines a background writer that commits writes in groups.
+
+Every transaction ends with a commit, and (unless the `throughput` profile is
+used) every commit waits for the disk to sync, so when lots of threads book at
+once, the number of commits per second limits the number of bookings per
+second, not the CPU.
+
+The writer takes write requests from any number of threads, and runs them on
+it's own thread in batches: everything that arrives within a few milliseconds
+of the first request (or the first `maxBatch` requests) is written in one
+transaction, with one commit. Each request runs in it's own savepoint, so a
+request that fails is rolled back without failing the rest of the batch.
+
+Callers get a `Future` that completes with their own result (or error) once
+the batch has been committed:
+```
+with GroupCommitWriter(window=0.002) as writer:
+  bookingId = writer.booking__create(userId, datetime, filmTitle, tickets).result()
+```
+"""
+
+
+
+class _Request(_TYPING.NamedTuple):
+  """A call to run on the writer thread"""
+
+  future: _FUTURES.Future
+  function: _TYPING.Callable
+  args: tuple
+  kwargs: dict
+
+
+
+class GroupCommitWriter:
+  """Background thread that runs write requests in batches, one commit each"""
+
+  def __init__(self, window: float = 0.002, maxBatch: int = 100):
+    """
+    - `window`: seconds to wait for more requests after the first one of a
+      batch arrives
+    - `maxBatch`: most requests in one batch, a full batch is written straight
+      away
+    """
+
+    self.window = window
+    self.maxBatch = maxBatch
+
+    self._queue: _QUEUE.Queue[_Request | None] = _QUEUE.Queue()
+    self._lock = _THREADING.Lock()
+    self._closed = False
+
+    self.batches = 0
+    """Number of batches (transactions) committed"""
+
+    self.requests = 0
+    """Number of requests run"""
+
+    self._thread = _THREADING.Thread(
+      target=self._run, name="db-group-commit", daemon=True
+    )
+    self._thread.start()
+
+
+  def submit(self, function: _TYPING.Callable, *args, **kwargs) -> _FUTURES.Future:
+    """
+    Queue a call to a write function (e.g. a `Database` method), returns a
+    `Future` of it's result.
+
+    The function runs inside the batch's transaction, so it shouldn't commit,
+    and it's result only becomes visible to other connections once the whole
+    batch is committed.
+    """
+
+    future = _FUTURES.Future()
+
+    with self._lock:
+      if self._closed:
+        raise RuntimeError("The writer has been closed")
+      self._queue.put(_Request(future, function, args, kwargs))
+
+    return future
+
+
+  def booking__create(
+    self, userId: str, datetime, filmTitle: str, tickets
+  ) -> _FUTURES.Future:
+    """Queue `Database.booking__create`, returns a `Future` of the booking's id"""
+
+    return self.submit(_Database.booking__create,
+      userId, datetime, filmTitle, tickets
+    )
+
+
+  def stats(self) -> dict:
+    """Number of batches and requests, and the mean requests per batch"""
+
+    return {
+      "batches": self.batches,
+      "requests": self.requests,
+      "meanBatch": self.requests / self.batches if self.batches else 0.0,
+    }
+
+
+  def close(self):
+    """Write everything already queued, then stop the writer thread"""
+
+    with self._lock:
+      if self._closed: return
+      self._closed = True
+      self._queue.put(None)
+
+    self._thread.join()
+
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *_):
+    self.close()
+
+
+  def _run(self):
+    """Collect requests into batches and write them, until closed"""
+
+    stopping = False
+    while not stopping:
+      request = self._queue.get()
+      if request is None: break
+
+      batch = [request]
+      deadline = _TIME.monotonic() + self.window
+
+      while len(batch) < self.maxBatch:
+        timeout = deadline - _TIME.monotonic()
+        if timeout <= 0: break
+
+        try:
+          request = self._queue.get(timeout=timeout)
+        except _QUEUE.Empty:
+          break
+
+        if request is None:
+          stopping = True
+          break
+        batch.append(request)
+
+      self._commit(batch)
+
+    # Don't keep a connection open for a thread that's finished
+    if not _dbClient.pooled: _dbClient.database.close()
+
+
+  def _commit(self, batch: list[_Request]):
+    """Write a batch, then complete each request's future"""
+
+    batch = [
+      request for request in batch
+      if request.future.set_running_or_notify_cancel()
+    ]
+    if len(batch) == 0: return
+
+    try:
+      outcomes = self._write(batch)
+    except Exception as error:  # the transaction couldn't be committed
+      for request in batch:
+        request.future.set_exception(error)
+      return
+
+    self.batches += 1
+    self.requests += len(batch)
+
+    for request, (error, result) in zip(batch, outcomes):
+      if error is None:
+        request.future.set_result(result)
+      else:
+        request.future.set_exception(error)
+
+
+  @_dbClient.retryOnBusy()
+  def _write(self, batch: list[_Request]) -> list[tuple[Exception | None, _TYPING.Any]]:
+    """
+    Run every request of a batch in one transaction, each in it's own
+    savepoint, returns the `(error, result)` of each request
+    """
+
+    outcomes = []
+
+    with _dbClient.transaction(write=True) as database:
+      for request in batch:
+        try:
+          with database.atomic():
+            result = request.function(*request.args, **request.kwargs)
+        except Exception as error:
+          # The whole batch is retried if SQLite is busy
+          if _dbClient.isBusyError(error): raise
+          outcomes.append((error, None))
+        else:
+          outcomes.append((None, result))
+
+    return outcomes